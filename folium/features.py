@@ -6,6 +6,7 @@ Leaflet GeoJson and miscellaneous features.
 """
 
 import json
+import os
 import warnings
 import functools
 import operator
@@ -17,14 +18,35 @@ from branca.utilities import color_brewer
 from folium.folium import Map
 from folium.map import (FeatureGroup, Icon, Layer, Marker, Tooltip)
 from folium.utilities import (
-    validate_locations,
+    validate_location_array,
     _parse_size,
+    factorize,
+    get_arrow_geometry_column,
+    get_bin_edges,
     get_bounds,
+    get_feature_values,
+    get_geometry_bounds,
+    get_topojson_bounds,
+    get_url,
     image_to_url,
-    none_max,
-    none_min,
+    iter_geojson_features,
+    iter_geojson_seq,
+    join_keys,
+    arrow_to_geojson,
+    merge_bounds,
+    geopandas_to_geojson,
     get_obj_in_upper_tree,
+    SpatialIndex,
+    is_array_like,
+    is_arrow_table,
+    is_epsg_4326,
+    is_geojson_seq_path,
+    is_geoparquet_path,
     parse_options,
+    read_geoparquet,
+    simplify_geometry,
+    to_python_type,
+    write_geojson_seq,
 )
 from folium.vector_layers import PolyLine, path_options
 
@@ -32,7 +54,10 @@ from jinja2 import Template
 
 import numpy as np
 
-import requests
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
 
 
 class RegularPolygonMarker(Marker):
@@ -331,10 +356,25 @@ class GeoJson(Layer):
         * If dict, then data will be converted to JSON and embedded
         in the JavaScript.
         * If str, then data will be passed to the JavaScript as-is.
-    style_function: function, default None
-        Function mapping a GeoJson Feature to a style dict.
-    highlight_function: function, default None
+        URLs are downloaded with a shared session that retries on errors.
+        Use `folium.utilities.set_http_cache` to cache them on disk and
+        `folium.utilities.prefetch_urls` to download several at once.
+        * If pyarrow Table or the path of a GeoParquet file, the geometry
+        column (WKB or GeoArrow) is converted to GeoJSON and the other
+        columns become properties. With `keep_properties`, only those
+        columns are read from the file.
+        * Files and URLs with newline-delimited GeoJSON (GeoJSONSeq or
+        NDJSON, e.g. '.geojsonl' or '.ndjson') are read line by line. With
+        `embed=False` the browser loads them progressively as well.
+        * Iterables of features or of NDJSON lines are read one at a time.
+    style_function: function or dict, default None
+        Function mapping a GeoJson Feature to a style dict. Can also be a
+        dict mapping style options to either a single value or an array-like
+        (list, numpy array, pandas Series) with one value per feature, in the
+        order of the features.
+    highlight_function: function or dict, default None
         Function mapping a GeoJson Feature to a style dict for mouse events.
+        Accepts a dict of values or array-likes like `style_function`.
     name : string, default None
         The name of the Layer, as it will appear in LayerControls
     overlay : bool, default True
@@ -353,6 +393,59 @@ class GeoJson(Layer):
     embed: bool, default True
         Whether to embed the data in the html file or not. Note that disabling
         embedding is only supported if you provide a file link or URL.
+    vectorized: bool, default False
+        If True, `style_function` and `highlight_function` are called once
+        with a pandas DataFrame of the properties of all features, one row per
+        feature. They should return a dict like described above, or a
+        DataFrame with a column per style option. Requires pandas.
+    style_keys: list of str, default None
+        Names of the properties `style_function` and `highlight_function`
+        depend on. If given, the functions are only called once for each
+        distinct combination of these property values and the result is
+        reused for the other features. Statistics are kept in `cache_info`.
+    compact_styles: bool, default False
+        If True, the styles are written to the output once, as a palette,
+        with a lookup table from feature to palette index, instead of a
+        switch statement with a case for each feature. Recommended for
+        large datasets.
+    id_field: str, default None
+        The field that uniquely identifies each feature, for example 'id' or
+        'properties.name'. If None, a unique field is looked for, or an 'id'
+        field is added to the data.
+    stream: bool, default False
+        Read a file or URL feature by feature instead of loading it at once,
+        so very large files can be filtered while they are read. File
+        objects and iterables of features are always read this way. Uses
+        the `ijson` package if it's installed.
+    feature_filter: function, default None
+        Function that takes a feature and returns False if it should be
+        left out. Applied while the features are read.
+    keep_properties: list of str or 'auto', default None
+        If a list, only these properties are kept on the features, while
+        they are read. If 'auto', the properties that aren't used in the
+        browser are left out when the layer is rendered, after styling:
+        only those shown by tooltips and popups, the feature identifier
+        and the names in `required_properties` are kept. The data passed
+        in isn't changed.
+    simplify_tolerance: float, default None
+        Simplify lines and polygons with this tolerance, in degrees, using
+        the Douglas-Peucker algorithm.
+    ndjson_sidecar: str, default None
+        Path of a file to write the features to as newline-delimited GeoJSON
+        when the map is rendered, instead of embedding them in the html. The
+        browser then fetches the file and adds the features chunk by chunk
+        while it's downloading, instead of parsing them in one go. The file
+        is written relative to the working directory, while the browser
+        resolves a relative URL against the html page, so set `ndjson_url`
+        unless the html file is saved in the working directory.
+    ndjson_url: str, default None
+        URL of `ndjson_sidecar` as seen from the page, defaults to
+        `ndjson_sidecar`.
+    clip_to: bounds or True, default None
+        Only render the features that intersect these bounds, of the form
+        [[lat_min, lon_min], [lat_max, lon_max]]. If True, the `max_bounds`
+        of the parent Map are used. Features are selected with a spatial
+        index over their bounding boxes, see `query_bounds`.
 
     Examples
     --------
@@ -364,6 +457,21 @@ class GeoJson(Layer):
     >>> GeoJson(json.load(open('foo.json')))
     >>> # Providing string.
     >>> GeoJson(open('foo.json').read())
+    >>> # Reading a large file feature by feature, keeping only some.
+    >>> GeoJson('foo.json', stream=True, keep_properties=['name'],
+    ...         feature_filter=lambda f: f['properties']['pop'] > 1000)
+    >>> # Reading only some columns of a GeoParquet file.
+    >>> GeoJson('foo.parquet', keep_properties=['name'])
+    >>> # Only embed the properties shown in the tooltip.
+    >>> GeoJson('foo.json', keep_properties='auto',
+    ...         tooltip=GeoJsonTooltip(fields=['name']))
+    >>> # Reading NDJSON and loading it progressively in the browser.
+    >>> GeoJson('foo.ndjson', ndjson_sidecar='foo_layer.ndjson')
+    >>> # Writing the features next to a page saved in another directory.
+    >>> GeoJson('foo.ndjson', ndjson_sidecar='site/data/foo_layer.ndjson',
+    ...         ndjson_url='data/foo_layer.ndjson')
+    >>> # Only show the features around Paris.
+    >>> GeoJson('europe.json', clip_to=[[48.5, 1.8], [49.2, 2.9]])
 
     >>> # Provide a style_function that color all states green but Alabama.
     >>> style_function = lambda x: {'fillColor': '#0000ff' if
@@ -371,10 +479,30 @@ class GeoJson(Layer):
     ...                             '#00ff00'}
     >>> GeoJson(geojson, style_function=style_function)
 
+    >>> # Provide the styles as columns, one value per feature.
+    >>> GeoJson(geojson, style_function={'fillColor': colors, 'weight': 1})
+    >>> # Compute the styles at once from a DataFrame of properties.
+    >>> GeoJson(geojson, vectorized=True, style_function=lambda df: {
+    ...     'fillColor': np.where(df['name'] == 'Alabama', '#0000ff', '#00ff00')})
+
     """
     _template = Template(u"""
+        {% macro lookup_function(this, switch, function_name, lookup) %}
+        var {{ this.get_name() }}_{{ switch }}s = [
+            {%- for style in lookup.palette %}
+            {{ style }},
+            {%- endfor %}
+        ];
+        var {{ this.get_name() }}_{{ switch }}_index = {{ lookup.index|tojson }};
+        function {{ this.get_name() }}_{{ function_name }}(feature) {
+            return {{ this.get_name() }}_{{ switch }}s[
+                {{ this.get_name() }}_{{ switch }}_index[{{ this.feature_identifier }}] || 0];
+        }
+        {%- endmacro %}
         {% macro script(this, kwargs) %}
-        {%- if this.style %}
+        {%- if this.style and this.compact_styles %}
+        {{ lookup_function(this, 'style', 'styler', this.style_lookup) }}
+        {%- elif this.style %}
         function {{ this.get_name() }}_styler(feature) {
             switch({{ this.feature_identifier }}) {
                 {%- for style, ids_list in this.style_map.items() if not style == 'default' %}
@@ -386,7 +514,9 @@ class GeoJson(Layer):
             }
         }
         {%- endif %}
-        {%- if this.highlight %}
+        {%- if this.highlight and this.compact_styles %}
+        {{ lookup_function(this, 'highlight', 'highlighter', this.highlight_lookup) }}
+        {%- elif this.highlight %}
         function {{ this.get_name() }}_highlighter(feature) {
             switch({{ this.feature_identifier }}) {
                 {%- for style, ids_list in this.highlight_map.items() if not style == 'default' %}
@@ -426,7 +556,31 @@ class GeoJson(Layer):
             {{ this.get_name() }}.addData(data)
                 .addTo({{ this._parent.get_name() }});
         }
-        {%- if this.embed %}
+        {%- if this.ndjson_link %}
+        (function() {
+            var decoder = new TextDecoder(), buffer = '';
+            function addLines(text, done) {
+                var lines = (buffer + text).split('\\n'), features = [];
+                buffer = done ? '' : lines.pop();
+                for (var i = 0; i < lines.length; i++) {
+                    var line = lines[i].replace(/^\\x1e/, '').trim();
+                    if (line) { features.push(JSON.parse(line)); }
+                }
+                if (features.length) { {{ this.get_name() }}_add(features); }
+            }
+            fetch({{ this.ndjson_link|tojson }}).then(function(response) {
+                var reader = response.body.getReader();
+                function pump() {
+                    return reader.read().then(function(result) {
+                        if (result.done) { return addLines(decoder.decode(), true); }
+                        addLines(decoder.decode(result.value, {stream: true}), false);
+                        return pump();
+                    });
+                }
+                return pump();
+            });
+        })();
+        {%- elif this.embed %}
             {{ this.get_name() }}_add({{ this.data|tojson }});
         {%- else %}
             $.ajax({{ this.embed_link|tojson }}, {dataType: 'json'})
@@ -437,11 +591,37 @@ class GeoJson(Layer):
 
     def __init__(self, data, style_function=None, highlight_function=None,  # noqa
                  name=None, overlay=True, control=True, show=True,
-                 smooth_factor=None, tooltip=None, embed=True):
+                 smooth_factor=None, tooltip=None, embed=True,
+                 vectorized=False, style_keys=None, compact_styles=False,
+                 id_field=None, stream=False, feature_filter=None,
+                 keep_properties=None, simplify_tolerance=None,
+                 ndjson_sidecar=None, ndjson_url=None, clip_to=None):
         super(GeoJson, self).__init__(name=name, overlay=overlay,
                                       control=control, show=show)
         self._name = 'GeoJson'
         self.embed = embed
+        self.vectorized = vectorized
+        self.style_keys = style_keys
+        self.compact_styles = compact_styles
+        self.id_field = id_field
+        self.stream = stream
+        self.feature_filter = feature_filter
+        self.keep_properties = keep_properties
+        # Properties to keep while reading, pruning with 'auto' is later.
+        self._read_properties = None if keep_properties == 'auto' else keep_properties
+        self.required_properties = set()
+        self.simplify_tolerance = simplify_tolerance
+        self.ndjson_sidecar = ndjson_sidecar
+        self.ndjson_link = ndjson_url
+        if ndjson_url is None and ndjson_sidecar is not None:
+            self.ndjson_link = ndjson_sidecar.replace(os.sep, '/')
+        self.clip_to = clip_to
+        self._spatial_index = None
+        self._ingested = False
+        self._bounds = None
+        self.cache_info = {}
+        self._style_cache = {}
+        self._uncounted_calls = {}
         self.embed_link = None
         self.json = None
         self.parent_map = None
@@ -449,7 +629,21 @@ class GeoJson(Layer):
         self.style = style_function is not None
         self.highlight = highlight_function is not None
 
+        transform = (feature_filter is not None or self._read_properties is not None
+                     or bool(simplify_tolerance))
+        if transform and not embed:
+            raise ValueError('`feature_filter`, `keep_properties` and '
+                             '`simplify_tolerance` change the data, so they '
+                             'can only be used with `embed=True`.')
+        if clip_to is not None and not embed:
+            raise ValueError('`clip_to` can only be used with `embed=True`.')
+
         self.data = self.process_data(data)
+        if transform and not self._ingested:
+            self.convert_to_feature_collection()
+            self.data = self.ingest_features(self.data['features'])
+        if clip_to is not None:
+            self.convert_to_feature_collection()
 
         if self.style or self.highlight:
             self.convert_to_feature_collection()
@@ -474,27 +668,101 @@ class GeoJson(Layer):
             self.embed = True
             return data
         elif isinstance(data, str):
-            if data.lower().startswith(('http:', 'ftp:', 'https:')):
-                if not self.embed:
-                    self.embed_link = data
-                return requests.get(data).json()
-            elif data.lstrip()[0] in '[{':  # This is a GeoJSON inline string
-                self.embed = True
-                return json.loads(data)
-            else:  # This is a filename
-                if not self.embed:
-                    self.embed_link = data
-                with open(data) as f:
-                    return json.loads(f.read())
+            return self._process_str(data)
+        elif is_arrow_table(data):
+            self.embed = True
+            return self._process_arrow(data)
         elif hasattr(data, '__geo_interface__'):
             self.embed = True
             if hasattr(data, 'to_crs'):
-                data = data.to_crs(epsg='4326')
+                if not is_epsg_4326(getattr(data, 'crs', None)):
+                    data = data.to_crs(epsg='4326')
+                return geopandas_to_geojson(data)
             return json.loads(json.dumps(data.__geo_interface__))
+        elif hasattr(data, 'read'):  # This is a file object
+            self.embed = True
+            if is_geojson_seq_path(getattr(data, 'name', None)):
+                return self.ingest_features(iter_geojson_seq(data))
+            return self.ingest_features(iter_geojson_features(data))
+        elif hasattr(data, '__iter__'):  # This is an iterable of features
+            self.embed = True
+            return self.ingest_features(iter_geojson_seq(data))
         else:
             raise ValueError('Cannot render objects with any missing geometries'
                              ': {!r}'.format(data))
 
+    def _process_str(self, data):
+        """Load GeoJSON from a URL, a GeoJSON string or a filename."""
+        if data.lower().startswith(('http:', 'ftp:', 'https:')):
+            if not self.embed:
+                self.embed_link = data
+            if is_geojson_seq_path(data):
+                return self._process_geojson_seq(data, get_url(data, stream=True))
+            with get_url(data, stream=self.stream) as f:
+                if self.stream:
+                    return self.ingest_features(iter_geojson_features(f))
+                return json.load(f)
+        elif data.lstrip()[0] in '[{':  # This is a GeoJSON inline string
+            self.embed = True
+            return json.loads(data)
+        elif is_geoparquet_path(data):
+            self.embed = True
+            return self._process_arrow(
+                read_geoparquet(data, columns=self._read_properties))
+        elif is_geojson_seq_path(data):
+            return self._process_geojson_seq(data, open(data, 'rb'))
+        else:  # This is a filename
+            if not self.embed:
+                self.embed_link = data
+            if self.stream:
+                with open(data, 'rb') as f:
+                    return self.ingest_features(iter_geojson_features(f))
+            with open(data) as f:
+                return json.loads(f.read())
+
+    def _process_geojson_seq(self, link, fileobj):
+        """Read newline-delimited GeoJSON from an opened file or URL."""
+        if not self.embed and self.ndjson_link is None:
+            self.ndjson_link = link
+        with fileobj as f:
+            return self.ingest_features(iter_geojson_seq(f))
+
+    def _process_arrow(self, table):
+        """Convert a pyarrow Table with a geometry column to GeoJSON."""
+        if self._read_properties is not None:
+            geometry_column, _ = get_arrow_geometry_column(table.schema)
+            table = table.select([
+                name for name in table.column_names
+                if name == geometry_column or name in self._read_properties])
+        data, self._bounds = arrow_to_geojson(table)
+        return data
+
+    def ingest_features(self, features):
+        """Create a FeatureCollection from an iterable of features.
+
+        Features are filtered, pruned and simplified one at a time while
+        they are read, and the bounds of the layer are computed on the way.
+        """
+        collected = []
+        bounds = [[None, None], [None, None]]
+        for feature in features:
+            if self.feature_filter is not None and not self.feature_filter(feature):
+                continue
+            if self._read_properties is not None:
+                properties = feature.get('properties') or {}
+                feature = dict(feature, properties={
+                    key: value for key, value in properties.items()
+                    if key in self._read_properties})
+            if self.simplify_tolerance:
+                feature = dict(feature, geometry=simplify_geometry(
+                    feature.get('geometry'), self.simplify_tolerance))
+            bounds = merge_bounds(bounds,
+                                  get_geometry_bounds(feature.get('geometry')))
+            collected.append(feature)
+        self._bounds = bounds
+        self._ingested = True
+        return {'type': 'FeatureCollection', 'features': collected}
+
     def convert_to_feature_collection(self):
         """Convert data into a FeatureCollection if it is not already."""
         if self.data['type'] == 'FeatureCollection':
@@ -514,13 +782,54 @@ class GeoJson(Layer):
     def _validate_function(self, func, name):
         """
         Tests `self.style_function` and `self.highlight_function` to ensure
-        they are functions returning dictionaries.
+        they are functions returning dictionaries, or dictionaries with a
+        value per feature.
         """
+        if isinstance(func, dict):
+            n_features = len(self.data['features'])
+            for key, value in func.items():
+                if is_array_like(value) and len(value) != n_features:
+                    raise ValueError(
+                        'The values of {} for {!r} should have the same length '
+                        'as the features, {} instead of {}.'
+                        .format(name, key, len(value), n_features))
+            return
+        if self.vectorized:
+            if not callable(func):
+                raise ValueError('{} should be a function that accepts a '
+                                 'DataFrame of properties.'.format(name))
+            return
         test_feature = self.data['features'][0]
-        if not callable(func) or not isinstance(func(test_feature), dict):
+        content = func(test_feature) if callable(func) else None
+        if not isinstance(content, dict):
             raise ValueError('{} should be a function that accepts items from '
                              'data[\'features\'] and returns a dictionary.'
                              .format(name))
+        if self.style_keys is not None:
+            # Keep the result so the memoized mapping doesn't call it again.
+            switch = name.split('_')[0]
+            cache = self._get_style_cache(func, switch)
+            cache[self._get_style_inputs(test_feature)] = content
+            self._uncounted_calls[switch] = self._uncounted_calls.get(switch, 0) + 1
+
+    def _get_style_cache(self, func, switch):
+        """Return the style dicts cached for `func`, empty if it was replaced."""
+        cached_func, results = self._style_cache.get(switch, (None, None))
+        if cached_func is not func:
+            results = {}
+            self._style_cache[switch] = (func, results)
+            self._uncounted_calls.pop(switch, None)
+        return results
+
+    def _get_style_inputs(self, feature):
+        """Return a hashable of the properties listed in `style_keys`."""
+        properties = feature.get('properties') or {}
+        inputs = tuple(properties.get(key) for key in self.style_keys)
+        try:
+            hash(inputs)
+        except TypeError:
+            inputs = json.dumps(inputs, sort_keys=True, default=str)
+        return inputs
 
     def find_identifier(self):
         """Find a unique identifier for each feature, create it if needed.
@@ -530,21 +839,21 @@ class GeoJson(Layer):
          - MUST have a 'properties' field. The content can be any json object
            or even null.
 
+        The 'id' field and all properties of the first feature are checked
+        in a single pass over the features. A candidate is dropped as soon
+        as it's missing or duplicated, and the scan stops when no candidates
+        are left. The scan is skipped entirely if `id_field` is given.
+
         """
+        if self.id_field is not None:
+            id_field = self.id_field
+            if not id_field.startswith('feature.'):
+                id_field = 'feature.' + id_field
+            return id_field
         feats = self.data['features']
-        # Each feature has an 'id' field with a unique value.
-        unique_ids = set(feat.get('id', None) for feat in feats)
-        if None not in unique_ids and len(unique_ids) == len(feats):
-            return 'feature.id'
-        # Each feature has a unique string or int property.
-        if all(isinstance(feat.get('properties', None), dict) for feat in feats):
-            for key in feats[0]['properties']:
-                unique_values = set(
-                    feat['properties'].get(key, None) for feat in feats
-                    if isinstance(feat['properties'].get(key, None), (str, int))
-                )
-                if len(unique_values) == len(feats):
-                    return 'feature.properties.{}'.format(key)
+        id_field = self._find_unique_field(feats)
+        if id_field is not None:
+            return id_field
         # We add an 'id' field with a unique value to the data.
         if self.embed:
             for i, feature in enumerate(feats):
@@ -556,25 +865,190 @@ class GeoJson(Layer):
             'field to your geojson data or set `embed=True`. '
         )
 
+    def _find_unique_field(self, feats):
+        """Return the path of 'id' or of the first unique property, or None.
+
+        The candidate for the 'id' field is keyed by None, so it's distinct
+        from a property named 'id'.
+
+        """
+        first_properties = feats[0].get('properties') if feats else None
+        candidates = {None: set()}
+        if isinstance(first_properties, dict):
+            candidates.update((key, set()) for key in first_properties)
+        for feat in feats:
+            for key, seen in list(candidates.items()):
+                value, valid = self._get_identifier_candidate(feat, key)
+                if not valid or value in seen:
+                    del candidates[key]
+                else:
+                    seen.add(value)
+            if not candidates:
+                return None
+        if None in candidates:
+            return 'feature.id'
+        for key in candidates:
+            return 'feature.properties.{}'.format(key)
+        return None
+
+    @staticmethod
+    def _get_identifier_candidate(feature, key):
+        """Return the value of 'id' (key None) or a property, and if it's usable."""
+        if key is None:
+            value = feature.get('id', None)
+            return value, value is not None
+        properties = feature.get('properties', None)
+        if not isinstance(properties, dict):
+            return None, False
+        value = properties.get(key, None)
+        return value, isinstance(value, (str, int))
+
     def _get_self_bounds(self):
         """
         Computes the bounds of the object itself (not including it's children)
         in the form [[lat_min, lon_min], [lat_max, lon_max]].
 
         """
+        if self._bounds is not None:
+            return self._bounds
         return get_bounds(self.data, lonlat=True)
 
     def render(self, **kwargs):
         self.parent_map = get_obj_in_upper_tree(self, Map)
-        if self.style or self.highlight:
-            mapper = GeoJsonStyleMapper(self.data, self.feature_identifier,
-                                        self)
+        data = self.data
+        selection = self._get_clip_selection()
+        if selection is not None:
+            self.data = dict(data, features=[data['features'][i] for i in selection])
+        try:
+            self._render_styles(selection)
+            if self.keep_properties == 'auto':
+                self.data = self._prune_properties(self.data)
+            if self.ndjson_sidecar is not None:
+                self.to_geojson_seq(self.ndjson_sidecar)
+            super(GeoJson, self).render()
+        finally:
+            self.data = data
+
+    def get_required_properties(self):
+        """Return the names of the properties that are used in the browser.
+
+        These are the fields of tooltips and popups, the property that
+        identifies the features and the names in `required_properties`.
+        """
+        names = set(self.required_properties)
+        identifier = getattr(self, 'feature_identifier', '')
+        if identifier.startswith('feature.properties.'):
+            names.add(identifier.split('.')[2])
+        for child in self._children.values():
+            names.update(getattr(child, 'fields', None) or ())
+        return names
+
+    def _prune_properties(self, data):
+        """Return a copy of the data with only the required properties."""
+        names = self.get_required_properties()
+        features = []
+        for feature in data['features']:
+            properties = feature.get('properties')
+            if properties:
+                feature = dict(feature, properties={
+                    key: value for key, value in properties.items()
+                    if key in names})
+            features.append(feature)
+        return dict(data, features=features)
+
+    def _render_styles(self, selection):
+        """Create the style and highlight maps of the features to render."""
+        if not (self.style or self.highlight):
+            return
+        mapper = GeoJsonStyleMapper(self.data, self.feature_identifier, self)
+        if not self.data['features']:
+            # Nothing to style, for instance if `clip_to` matches no features.
+            empty = {'default': json.dumps({})}
+            self.style_map, self.highlight_map = dict(empty), dict(empty)
+        else:
             if self.style:
-                self.style_map = mapper.get_style_map(self.style_function)
+                self.style_map = mapper.get_style_map(
+                    self._select_columns(self.style_function, selection))
             if self.highlight:
                 self.highlight_map = mapper.get_highlight_map(
-                    self.highlight_function)
-        super(GeoJson, self).render()
+                    self._select_columns(self.highlight_function, selection))
+        if self.compact_styles:
+            feature_ids = mapper.get_feature_ids()
+            if self.style:
+                self.style_lookup = mapper.get_lookup_table(
+                    self.style_map, feature_ids)
+            if self.highlight:
+                self.highlight_lookup = mapper.get_lookup_table(
+                    self.highlight_map, feature_ids)
+
+    @staticmethod
+    def _select_columns(func, selection):
+        """Select the values of the clipped features from a columnar style."""
+        if selection is None or not isinstance(func, dict):
+            return func
+        return {key: np.asarray(value, dtype=object)[selection]
+                if is_array_like(value) else value
+                for key, value in func.items()}
+
+    def _get_clip_selection(self):
+        """Return the positions of the features within `clip_to`, or None."""
+        if self.clip_to is None:
+            return None
+        bounds = self.clip_to
+        if bounds is True:
+            bounds = (self.parent_map.options.get('maxBounds')
+                      if self.parent_map is not None else None)
+            if bounds is None:
+                return None
+        return self.query_bounds(bounds, return_positions=True)
+
+    def get_spatial_index(self):
+        """Return a SpatialIndex over the bounding boxes of the features.
+
+        It's built on first use and kept for later queries.
+        """
+        if self._spatial_index is None:
+            self.convert_to_feature_collection()
+            self._spatial_index = SpatialIndex([
+                get_geometry_bounds(feature.get('geometry'))
+                for feature in self.data['features']])
+        return self._spatial_index
+
+    def query_bounds(self, bounds, return_positions=False):
+        """Return the features whose bounding box intersects `bounds`.
+
+        Parameters
+        ----------
+        bounds: [[lat_min, lon_min], [lat_max, lon_max]]
+        return_positions: bool, default False
+            Return the positions of the features in the data instead.
+
+        """
+        positions = self.get_spatial_index().query(bounds)
+        if return_positions:
+            return positions
+        return [self.data['features'][i] for i in positions]
+
+    def query_point(self, location, return_positions=False):
+        """Return the features whose bounding box contains a point.
+
+        Parameters
+        ----------
+        location: [lat, lon]
+        return_positions: bool, default False
+            Return the positions of the features in the data instead.
+
+        """
+        positions = self.get_spatial_index().query_point(location)
+        if return_positions:
+            return positions
+        return [self.data['features'][i] for i in positions]
+
+    def to_geojson_seq(self, path):
+        """Write the features to a newline-delimited GeoJSON file."""
+        self.convert_to_feature_collection()
+        with open(path, 'w') as f:
+            write_geojson_seq(self.data['features'], f)
 
 
 class GeoJsonStyleMapper:
@@ -598,23 +1072,151 @@ class GeoJsonStyleMapper:
 
     def _create_mapping(self, func, switch):
         """Internal function to create the mapping."""
+        if isinstance(func, dict):
+            return self._create_columnar_mapping(func, switch)
+        if self.geojson_obj.vectorized:
+            return self._create_columnar_mapping(
+                self._call_vectorized(func), switch)
+        if self.geojson_obj.style_keys is not None:
+            return self._create_memoized_mapping(func, switch)
         mapping = {}
         for feature in self.data['features']:
             content = func(feature)
             if switch == 'style':
-                for key, value in content.items():
-                    if isinstance(value, MacroElement):
-                        # Make sure objects are rendered:
-                        if value._parent is None:
-                            value._parent = self.geojson_obj
-                            value.render()
-                        # Replace objects with their Javascript var names:
-                        content[key] = "{{'" + value.get_name() + "'}}"
+                self._replace_macro_elements(content)
             key = self._to_key(content)
             mapping.setdefault(key, []).append(self.get_feature_id(feature))
         self._set_default_key(mapping)
         return mapping
 
+    def _create_columnar_mapping(self, columns, switch):
+        """Create the mapping from a dict with values or arrays of values.
+
+        Each array is factorized into integer codes, and features are
+        grouped on their combination of codes, so every distinct style is
+        only created and serialized once.
+        """
+        n_features = len(self.data['features'])
+        scalars, names, codes, uniques = {}, [], [], []
+        for name, value in columns.items():
+            if is_array_like(value):
+                column_codes, column_uniques = factorize(value)
+                names.append(name)
+                codes.append(column_codes)
+                uniques.append(column_uniques)
+            else:
+                scalars[name] = value
+        if codes:
+            styles, inverse = np.unique(np.stack(codes, axis=1), axis=0,
+                                        return_inverse=True)
+            inverse = inverse.ravel()
+        else:
+            styles = np.zeros((1, 0), dtype=np.intp)
+            inverse = np.zeros(n_features, dtype=np.intp)
+        feature_ids = self.get_feature_ids()
+        order = np.argsort(inverse, kind='stable')
+        splits = np.cumsum(np.bincount(inverse, minlength=len(styles)))[:-1]
+        mapping = {}
+        for style, indices in zip(styles, np.split(order, splits)):
+            content = dict(scalars)
+            for name, code, column_uniques in zip(names, style, uniques):
+                content[name] = to_python_type(column_uniques[code])
+            if switch == 'style':
+                self._replace_macro_elements(content)
+            mapping.setdefault(self._to_key(content), []).extend(
+                feature_ids[i] for i in indices)
+        self._set_default_key(mapping)
+        return mapping
+
+    def _create_memoized_mapping(self, func, switch):
+        """Create the mapping, calling `func` once per distinct input.
+
+        The inputs are the feature properties named in `style_keys`. The
+        style dicts are kept on the GeoJson object between renders as long
+        as `func` isn't replaced, the resulting keys only during this mapping.
+        """
+        results = self.geojson_obj._get_style_cache(func, switch)
+        keys = {}
+        # Count the call made when validating the function as well.
+        calls = self.geojson_obj._uncounted_calls.pop(switch, 0)
+        mapping = {}
+        for feature in self.data['features']:
+            inputs = self.geojson_obj._get_style_inputs(feature)
+            key = keys.get(inputs)
+            if key is None:
+                content = results.get(inputs)
+                if content is None:
+                    content = results[inputs] = func(feature)
+                    calls += 1
+                content = dict(content)
+                if switch == 'style':
+                    self._replace_macro_elements(content)
+                key = keys[inputs] = self._to_key(content)
+            mapping.setdefault(key, []).append(self.get_feature_id(feature))
+        n_features = len(self.data['features'])
+        self.geojson_obj.cache_info[switch] = {
+            'hits': n_features - calls,
+            'misses': calls,
+            'hit_rate': (n_features - calls) / n_features if n_features else 0.0,
+            'distinct_inputs': len(keys),
+            'distinct_styles': len(mapping),
+        }
+        self._set_default_key(mapping)
+        return mapping
+
+    def _call_vectorized(self, func):
+        """Call a vectorized style function on a DataFrame of properties."""
+        if pd is None:
+            raise ImportError('pandas is required for vectorized styling.')
+        properties = pd.DataFrame.from_records(
+            [feature.get('properties') or {}
+             for feature in self.data['features']])
+        columns = func(properties)
+        if isinstance(columns, pd.DataFrame):
+            columns = {name: columns[name] for name in columns.columns}
+        if not isinstance(columns, dict):
+            raise ValueError('A vectorized style function should return a '
+                             'dict or a DataFrame, got {!r}.'.format(columns))
+        return columns
+
+    def _replace_macro_elements(self, content):
+        """Replace MacroElement objects by their Javascript var names."""
+        for key, value in content.items():
+            if isinstance(value, MacroElement):
+                # Make sure objects are rendered:
+                if value._parent is None:
+                    value._parent = self.geojson_obj
+                    value.render()
+                # Replace objects with their Javascript var names:
+                content[key] = "{{'" + value.get_name() + "'}}"
+
+    @staticmethod
+    def get_lookup_table(mapping, feature_ids):
+        """Convert a mapping into a palette of styles and an index.
+
+        The palette starts with the default style. The index maps feature
+        ids to palette positions, leaving out the default. If the ids are
+        the positions of the features, the index is a list instead.
+        """
+        palette = [mapping['default']]
+        index = {}
+        for style, ids_list in mapping.items():
+            if style == 'default':
+                continue
+            for id_val in ids_list:
+                index[id_val] = len(palette)
+            palette.append(style)
+        positional = all(str(id_val) == str(i)
+                         for i, id_val in enumerate(feature_ids))
+        if positional:
+            index = [index.get(id_val, 0) for id_val in feature_ids]
+        return {'palette': palette, 'index': index}
+
+    def get_feature_ids(self):
+        """Return a list with a value identifying each feature."""
+        return [self.get_feature_id(feature)
+                for feature in self.data['features']]
+
     def get_feature_id(self, feature):
         """Return a value identifying the feature."""
         fields = self.feature_identifier.split('.')[1:]
@@ -690,11 +1292,22 @@ class TopoJson(Layer):
     _template = Template(u"""
         {% macro script(this, kwargs) %}
             var {{ this.get_name() }}_data = {{ this.data|tojson }};
+            var {{ this.get_name() }}_features = topojson.feature(
+                {{ this.get_name() }}_data,
+                {{ this.get_name() }}_data.{{ this.object_path }}
+            );
+            {%- if this.style_table %}
+            var {{ this.get_name() }}_styles = {{ this.style_table.palette|tojson }};
+            var {{ this.get_name() }}_style_index = {{ this.style_table.index|tojson }};
+            {{ this.get_name() }}_features.features.forEach(function(feature, i) {
+                var index = {{ this.get_name() }}_style_index;
+                feature.properties.style = Object.assign(
+                    {}, feature.properties.style,
+                    {{ this.get_name() }}_styles[index ? index[i] : 0]);
+            });
+            {%- endif %}
             var {{ this.get_name() }} = L.geoJson(
-                topojson.feature(
-                    {{ this.get_name() }}_data,
-                    {{ this.get_name() }}_data.{{ this.object_path }}
-                ),
+                {{ this.get_name() }}_features,
                 {
                 {%- if this.smooth_factor is not none %}
                     smoothFactor: {{ this.smooth_factor|tojson }},
@@ -732,6 +1345,9 @@ class TopoJson(Layer):
         self.style_function = style_function
 
         self.smooth_factor = smooth_factor
+        self.style_table = None
+        self._style_table_function = None
+        self._bounds = None
 
         if isinstance(tooltip, (GeoJsonTooltip, Tooltip)):
             self.add_child(tooltip)
@@ -739,21 +1355,34 @@ class TopoJson(Layer):
             self.add_child(Tooltip(tooltip))
 
     def style_data(self):
-        """Applies self.style_function to each feature of self.data."""
-
-        def recursive_get(data, keys):
-            if len(keys):
-                return recursive_get(data.get(keys[0]), keys[1:])
-            else:
-                return data
+        """Apply self.style_function to each geometry of self.data.
 
-        geometries = recursive_get(self.data, self.object_path.split('.'))['geometries']  # noqa
-        for feature in geometries:
-            feature.setdefault('properties', {}).setdefault('style', {}).update(self.style_function(feature))  # noqa
+        The data isn't changed. The result is a table with a palette of the
+        distinct styles and the position in the palette of each geometry's
+        style, or None if all geometries have the same style. The table is
+        kept until the style function changes.
+        """
+        if self._style_table_function is self.style_function:
+            return self.style_table
+        obj = self.data
+        for key in self.object_path.split('.'):
+            obj = obj.get(key)
+        palette, positions, index = [], {}, []
+        for geometry in obj['geometries']:
+            key = json.dumps(self.style_function(geometry), sort_keys=True)
+            if key not in positions:
+                positions[key] = len(palette)
+                palette.append(json.loads(key))
+            index.append(positions[key])
+        self.style_table = {'palette': palette,
+                            'index': index if len(palette) > 1 else None}
+        self._style_table_function = self.style_function
+        return self.style_table
 
     def render(self, **kwargs):
         """Renders the HTML representation of the element."""
-        self.style_data()
+        if self.embed:
+            self.style_data()
         super(TopoJson, self).render(**kwargs)
 
         figure = self.get_root()
@@ -772,28 +1401,9 @@ class TopoJson(Layer):
         """
         if not self.embed:
             raise ValueError('Cannot compute bounds of non-embedded TopoJSON.')
-
-        xmin, xmax, ymin, ymax = None, None, None, None
-
-        for arc in self.data['arcs']:
-            x, y = 0, 0
-            for dx, dy in arc:
-                x += dx
-                y += dy
-                xmin = none_min(x, xmin)
-                xmax = none_max(x, xmax)
-                ymin = none_min(y, ymin)
-                ymax = none_max(y, ymax)
-        return [
-            [
-                self.data['transform']['translate'][1] + self.data['transform']['scale'][1] * ymin,  # noqa
-                self.data['transform']['translate'][0] + self.data['transform']['scale'][0] * xmin  # noqa
-            ],
-            [
-                self.data['transform']['translate'][1] + self.data['transform']['scale'][1] * ymax,  # noqa
-                self.data['transform']['translate'][0] + self.data['transform']['scale'][0] * xmax  # noqa
-            ]
-        ]
+        if self._bounds is None:
+            self._bounds = get_topojson_bounds(self.data)
+        return self._bounds
 
 
 class GeoJsonTooltip(Tooltip):
@@ -963,16 +1573,24 @@ class Choropleth(FeatureGroup):
     columns: dict or tuple, default None
         If the data is a Pandas DataFrame, the columns of data to be bound.
         Must pass column 1 as the key, and column 2 the values.
+        Pass more value columns to color the same geometries by several
+        metrics. The geometries are embedded once, and a control on the map
+        switches between the metrics by restyling the layer, each with its
+        own bins and legend.
     key_on: string, default None
         Variable in the `geo_data` GeoJSON file to bind the data to. Must
         start with 'feature' and be in JavaScript objection notation.
         Ex: 'feature.id' or 'feature.properties.statename'.
-    bins: int or sequence of scalars or str, default 6
+    bins: int or sequence of scalars or str or tuple, default 6
         If `bins` is an int, it defines the number of equal-width
         bins between the min and the max of the values.
         If `bins` is a sequence, it directly defines the bin edges.
         For more information on this parameter, have a look at
         numpy.histogram function.
+        Classifications for skewed data are 'quantile', 'equal_count' and
+        'jenks' (natural breaks). They make 6 bins, or pass a tuple like
+        ('jenks', 5) for another number. See
+        `folium.utilities.get_bin_edges`.
     fill_color: string, default 'blue'
         Area fill color. Can pass a hex code, color name, or if you are
         binding data, one of the following color brewer palettes:
@@ -1002,6 +1620,10 @@ class Choropleth(FeatureGroup):
         representation. Leaflet defaults to 1.0.
     highlight: boolean, default False
         Enable highlight functionality when hovering over a GeoJSON area.
+    keep_properties: list of str or 'auto', default None
+        Which properties of the GeoJSON features to embed, see GeoJson.
+        With 'auto', the property in `key_on` is kept besides the ones
+        shown by tooltips. Not used with a TopoJSON.
     name : string, optional
         The name of the layer, as it will appear in LayerControls
     overlay : bool, default False
@@ -1029,6 +1651,14 @@ class Choropleth(FeatureGroup):
     >>> Choropleth(geo_data='geo.json', data=df,
     ...            columns=['Data 1', 'Data 2'],
     ...            key_on='feature.properties.myvalue',
+    ...            bins=('jenks', 5))
+    >>> Choropleth(geo_data='geo.json', data=df,
+    ...            columns=['Data 1', 'Data 2', 'Data 3', 'Data 4'],
+    ...            key_on='feature.properties.myvalue',
+    ...            fill_color='PuBu')
+    >>> Choropleth(geo_data='geo.json', data=df,
+    ...            columns=['Data 1', 'Data 2'],
+    ...            key_on='feature.properties.myvalue',
     ...            fill_color='PuBu',
     ...            bins=[0, 20, 30, 40, 50, 60],
     ...            highlight=True)
@@ -1040,7 +1670,7 @@ class Choropleth(FeatureGroup):
                  line_weight=1, line_opacity=1, name=None, legend_name='',
                  overlay=True, control=True, show=True,
                  topojson=None, smooth_factor=None, highlight=None,
-                 **kwargs):
+                 keep_properties=None, **kwargs):
         super(Choropleth, self).__init__(name=name, overlay=overlay,
                                          control=control, show=show)
         self._name = 'Choropleth'
@@ -1059,119 +1689,275 @@ class Choropleth(FeatureGroup):
                 'choropleth `threshold_scale` parameter is now depreciated '
                 'in favor of the `bins` parameter.', DeprecationWarning)
 
-        # Create color_data dict
-        if hasattr(data, 'set_index'):
-            # This is a pd.DataFrame
-            color_data = data.set_index(columns[0])[columns[1]].to_dict()
-        elif hasattr(data, 'to_dict'):
-            # This is a pd.Series
-            color_data = data.to_dict()
-        elif data:
-            color_data = dict(data)
-        else:
-            color_data = None
-
+        color_data = self._get_color_data(data, columns)
         self.color_scale = None
+        self.color_scales = []
+        metrics = {}
 
         if color_data is not None and key_on is not None:
-            real_values = np.array(list(color_data.values()))
-            real_values = real_values[~np.isnan(real_values)]
-            _, bin_edges = np.histogram(real_values, bins=bins)
-
-            bins_min, bins_max = min(bin_edges), max(bin_edges)
-            if np.any((real_values < bins_min) | (real_values > bins_max)):
-                raise ValueError(
-                    'All values are expected to fall into one of the provided '
-                    'bins (or to be Nan). Please check the `bins` parameter '
-                    'and/or your data.')
-
-            # We add the colorscale
-            nb_bins = len(bin_edges) - 1
-            color_range = color_brewer(fill_color, n=nb_bins)
-            self.color_scale = StepColormap(
-                color_range,
-                index=bin_edges,
-                vmin=bins_min,
-                vmax=bins_max,
-                caption=legend_name)
-
-            # then we 'correct' the last edge for numpy digitize
-            # (we add a very small amount to fake an inclusive right interval)
-            increasing = bin_edges[0] <= bin_edges[-1]
-            bin_edges[-1] = np.nextafter(
-                bin_edges[-1],
-                (1 if increasing else -1) * np.inf)
-
-            key_on = key_on[8:] if key_on.startswith('feature.') else key_on
-
-            def get_by_key(obj, key):
-                return (obj.get(key, None) if len(key.split('.')) <= 1 else
-                        get_by_key(obj.get(key.split('.')[0], None),
-                                   '.'.join(key.split('.')[1:])))
-
-            def color_scale_fun(x):
-                key_of_x = get_by_key(x, key_on)
-                if key_of_x is None:
-                    raise ValueError("key_on `{!r}` not found in GeoJSON.".format(key_on))
-
-                if key_of_x not in color_data.keys():
-                    return nan_fill_color, nan_fill_opacity
-
-                value_of_x = color_data[key_of_x]
-                if np.isnan(value_of_x):
-                    return nan_fill_color, nan_fill_opacity
-
-                color_idx = np.digitize(value_of_x, bin_edges, right=False) - 1
-                return color_range[color_idx], fill_opacity
-
+            data_keys, data_columns = color_data
+            for metric, data_values in data_columns.items():
+                caption = legend_name if len(data_columns) == 1 else metric
+                color_scale, palette, codes = self._bin_data(
+                    data_values, bins, fill_color, nan_fill_color, caption)
+                self.color_scales.append(color_scale)
+                metrics[metric] = palette, codes
+            self.color_scale = self.color_scales[0]
+            palette, data_codes = next(iter(metrics.values()))
+            nan_code = len(palette) - 1
         else:
-            def color_scale_fun(x):
-                return fill_color, fill_opacity
-
-        def style_function(x):
-            color, opacity = color_scale_fun(x)
-            return {
-                'weight': line_weight,
-                'opacity': line_opacity,
-                'color': line_color,
-                'fillOpacity': opacity,
-                'fillColor': color
-            }
+            key_on = None
 
-        def highlight_function(x):
-            return {
-                'weight': line_weight + 2,
-                'fillOpacity': fill_opacity + .2
-            }
+        highlight_style = {
+            'weight': line_weight + 2,
+            'fillOpacity': fill_opacity + .2
+        }
 
+        line_style = {
+            'weight': line_weight,
+            'opacity': line_opacity,
+            'color': line_color,
+        }
         if topojson:
+            if len(metrics) > 1:
+                raise ValueError('Several value columns are not supported '
+                                 'with a TopoJSON.')
+            if key_on is not None:
+                styles = dict(zip(data_keys, data_codes))
+
+                def color_scale_fun(x):
+                    key_of_x = get_feature_values([x], key_on)[0]
+                    if key_of_x is None:
+                        raise ValueError("key_on `{!r}` not found in GeoJSON.".format(key_on))
+                    code = styles.get(key_of_x, nan_code)
+                    if code == nan_code:
+                        return nan_fill_color, nan_fill_opacity
+                    return palette[code], fill_opacity
+            else:
+                def color_scale_fun(x):
+                    return fill_color, fill_opacity
+
+            def style_function(x):
+                color, opacity = color_scale_fun(x)
+                return dict(line_style, fillOpacity=opacity, fillColor=color)
+
             self.geojson = TopoJson(
                 geo_data,
                 topojson,
                 style_function=style_function,
                 smooth_factor=smooth_factor)
         else:
+            # Load the features once, to extract their keys.
+            geo_data = GeoJson(geo_data)
+            geo_data.convert_to_feature_collection()
+            geo_data = geo_data.data
+            style = dict(line_style, fillOpacity=fill_opacity, fillColor=fill_color)
+            if key_on is not None:
+                feature_keys = get_feature_values(geo_data['features'], key_on)
+                if any(key is None for key in feature_keys):
+                    raise ValueError("key_on `{!r}` not found in GeoJSON.".format(key_on))
+                positions = join_keys(feature_keys, data_keys)
+                for metric, (metric_palette, codes) in metrics.items():
+                    metrics[metric] = metric_palette, np.where(
+                        positions < 0, len(metric_palette) - 1, codes[positions])
+                feature_codes = next(iter(metrics.values()))[1]
+                style['fillColor'] = palette[feature_codes]
+                style['fillOpacity'] = np.where(
+                    feature_codes == nan_code, nan_fill_opacity, fill_opacity)
             self.geojson = GeoJson(
                 geo_data,
-                style_function=style_function,
+                style_function=style,
                 smooth_factor=smooth_factor,
-                highlight_function=highlight_function if highlight else None)
+                highlight_function=highlight_style if highlight else None,
+                compact_styles=len(metrics) > 1,
+                keep_properties=keep_properties)
+            if key_on is not None and key_on.startswith('feature.properties.'):
+                self.geojson.required_properties.add(key_on.split('.')[2])
 
         self.add_child(self.geojson)
-        if self.color_scale:
-            self.add_child(self.color_scale)
+        for color_scale in self.color_scales:
+            self.add_child(color_scale)
+        if len(metrics) > 1:
+            self.metric_control = ChoroplethMetricControl(
+                self.geojson, metrics, self.color_scales,
+                style=line_style, fill_opacity=fill_opacity,
+                nan_fill_opacity=nan_fill_opacity)
+            self.add_child(self.metric_control)
+
+    @staticmethod
+    def _bin_data(data_values, bins, fill_color, nan_fill_color, legend_name):
+        """Return the color scale, the palette and the color code of each value.
+
+        All values are binned with a single call to np.digitize. The last
+        color of the palette is the `nan_fill_color`.
+        """
+        real_values = data_values[~np.isnan(data_values)]
+        bin_edges = get_bin_edges(real_values, bins)
+
+        bins_min, bins_max = min(bin_edges), max(bin_edges)
+        if np.any((real_values < bins_min) | (real_values > bins_max)):
+            raise ValueError(
+                'All values are expected to fall into one of the provided '
+                'bins (or to be Nan). Please check the `bins` parameter '
+                'and/or your data.')
+
+        # We add the colorscale
+        nb_bins = len(bin_edges) - 1
+        color_range = color_brewer(fill_color, n=nb_bins)
+        color_scale = StepColormap(
+            color_range,
+            index=bin_edges,
+            vmin=bins_min,
+            vmax=bins_max,
+            caption=legend_name)
+
+        # then we 'correct' the last edge for numpy digitize
+        # (we add a very small amount to fake an inclusive right interval)
+        increasing = bin_edges[0] <= bin_edges[-1]
+        bin_edges[-1] = np.nextafter(
+            bin_edges[-1],
+            (1 if increasing else -1) * np.inf)
+
+        codes = np.digitize(data_values, bin_edges, right=False) - 1
+        codes[np.isnan(data_values)] = nb_bins
+        palette = np.asarray(color_range + [nan_fill_color], dtype=object)
+        return color_scale, palette, codes
+
+    @staticmethod
+    def _get_color_data(data, columns):
+        """Return the keys and a dict with the float values of each column.
+
+        A Series or dict gives a single column named None.
+        """
+        if hasattr(data, 'set_index'):
+            # This is a pd.DataFrame
+            data = data.set_index(columns[0])
+            return data.index, {column: np.asarray(data[column], dtype=float)
+                                for column in columns[1:]}
+        if hasattr(data, 'to_dict'):
+            # This is a pd.Series
+            return data.index, {None: np.asarray(data.values, dtype=float)}
+        elif data:
+            data = dict(data)
+            return (list(data.keys()),
+                    {None: np.array(list(data.values()), dtype=float)})
+        return None
 
     def render(self, **kwargs):
         """Render the GeoJson/TopoJson and color scale objects."""
-        if self.color_scale:
+        if self.color_scales:
             # ColorMap needs Map as its parent
             assert isinstance(self._parent, Map), ('Choropleth must be added'
                                                    ' to a Map object.')
-            self.color_scale._parent = self._parent
+            for color_scale in self.color_scales:
+                color_scale._parent = self._parent
 
         super(Choropleth, self).render(**kwargs)
 
 
+class ChoroplethMetricControl(MacroElement):
+    """Switch the metric that colors a Choropleth, in the browser.
+
+    The geometry is embedded once, in the GeoJson layer. Each metric only
+    adds its palette and a string with a color code per feature, one
+    character each. Choosing a metric restyles the existing layer and shows
+    its legend. Used in the Choropleth class. Users don't have to call this
+    class directly.
+
+    Parameters
+    ----------
+    geojson: GeoJson
+        The layer to restyle.
+    metrics: dict
+        Maps each metric name to its palette and an array with the position
+        in the palette of the color of each feature. The last color of the
+        palette is for missing values.
+    color_scales: list of ColorMap
+        The legend of each metric, in the same order.
+    style: dict
+        The style options that are the same for all metrics.
+    fill_opacity: float
+    nan_fill_opacity: float
+        The fill opacity of features with a missing value.
+
+    """
+    _template = Template(u"""
+        {% macro script(this, kwargs) %}
+        var {{ this.get_name() }} = (function() {
+            var layer = {{ this.geojson.get_name() }};
+            var metrics = {{ this.metrics|tojson }};
+            var ids = {{ this.feature_ids|tojson }};
+            var legends = [
+                {%- for color_scale in this.color_scales %}
+                {{ color_scale.get_name() }},
+                {%- endfor %}
+            ];
+            var positions = {};
+            if (ids) {
+                for (var i = 0; i < ids.length; i++) { positions[ids[i]] = i; }
+            }
+            function show(m) {
+                var metric = metrics[m];
+                var nan = metric.palette.length - 1;
+                function style(feature) {
+                    var id = {{ this.geojson.feature_identifier }};
+                    var code = metric.codes.charCodeAt(ids ? positions[id] : Number(id)) - 48;
+                    var fill = code === nan ? {{ this.nan_fill_opacity|tojson }} : {{ this.fill_opacity|tojson }};
+                    return Object.assign({{ this.style|tojson }}, {
+                        fillColor: metric.palette[code], fillOpacity: fill});
+                }
+                // resetStyle, used by the highlight, also uses the new style.
+                layer.options.style = style;
+                layer.setStyle(style);
+                legends.forEach(function(legend, i) {
+                    legend.svg.style('display', i === m ? null : 'none');
+                });
+            }
+            var control = L.control({position: 'topright'});
+            control.onAdd = function(map) {
+                var div = L.DomUtil.create('div', 'leaflet-bar');
+                var select = L.DomUtil.create('select', '', div);
+                metrics.forEach(function(metric) {
+                    L.DomUtil.create('option', '', select).text = metric.name;
+                });
+                select.onchange = function() { show(select.selectedIndex); };
+                L.DomEvent.disableClickPropagation(div);
+                return div;
+            };
+            control.addTo({{ this.parent_map.get_name() }});
+            show(0);
+            return {control: control, show: show};
+        })();
+        {% endmacro %}
+        """)  # noqa
+
+    def __init__(self, geojson, metrics, color_scales, style, fill_opacity,
+                 nan_fill_opacity):
+        super(ChoroplethMetricControl, self).__init__()
+        self._name = 'ChoroplethMetricControl'
+        self.geojson = geojson
+        self.metrics = [
+            {'name': str(name), 'palette': list(palette),
+             'codes': ''.join(chr(48 + int(code)) for code in codes)}
+            for name, (palette, codes) in metrics.items()
+        ]
+        self.color_scales = color_scales
+        self.style = style
+        self.fill_opacity = fill_opacity
+        self.nan_fill_opacity = nan_fill_opacity
+        self.feature_ids = None
+        self.parent_map = None
+
+    def render(self, **kwargs):
+        self.parent_map = get_obj_in_upper_tree(self, Map)
+        feature_ids = GeoJsonStyleMapper(
+            self.geojson.data, self.geojson.feature_identifier,
+            self.geojson).get_feature_ids()
+        if not all(str(id_val) == str(i) for i, id_val in enumerate(feature_ids)):
+            self.feature_ids = feature_ids
+        super(ChoroplethMetricControl, self).render(**kwargs)
+
+
 class DivIcon(MacroElement):
     """
     Represents a lightweight icon for markers that uses a simple `div`
@@ -1337,15 +2123,41 @@ class CustomIcon(Icon):
         )
 
 
+def _get_colormap_lut(colormap, values):
+    """Map values through a colormap, calling it once per distinct color.
+
+    Returns a list of color strings and, for every value, its position in
+    that list. Step colormaps are looked up with a binary search over their
+    index, other colormaps are called once per unique value.
+
+    """
+    if isinstance(colormap, StepColormap):
+        index = np.asarray(colormap.index, dtype=float)
+        codes = np.searchsorted(index, values, side='left') - 1
+        codes = np.clip(codes, 0, len(index) - 2)
+        used, codes = np.unique(codes, return_inverse=True)
+        palette = [colormap((index[i] + index[i + 1]) / 2) for i in used]
+    else:
+        uniques, codes = np.unique(values, return_inverse=True)
+        palette = [colormap(value) for value in uniques.tolist()]
+    # Several steps may share a color, merge them.
+    palette, merged = np.unique(palette, return_inverse=True)
+    return palette.tolist(), merged.ravel()[codes.ravel()]
+
+
 class ColorLine(FeatureGroup):
     """
     Draw data on a map with specified colors.
 
+    Consecutive segments that share a color are merged into a single line
+    and all lines of one color are drawn as one multi-polyline, so long
+    tracks stay light in the output.
+
     Parameters
     ----------
-    positions: tuple or list
+    positions: tuple, list or numpy.ndarray
         The list of points latitude and longitude
-    colors: tuple or list
+    colors: tuple, list or numpy.ndarray
         The list of segments colors.
         It must have length equal to `len(positions)-1`.
     colormap: branca.colormap.Colormap or list or tuple
@@ -1371,24 +2183,38 @@ class ColorLine(FeatureGroup):
                  weight=None, opacity=None, **kwargs):
         super(ColorLine, self).__init__(**kwargs)
         self._name = 'ColorLine'
-        positions = validate_locations(positions)
+        positions = validate_location_array(positions)
+        colors = np.asarray(colors, dtype=float).ravel()
+        n_segments = min(len(positions) - 1, len(colors))
+        if n_segments < 1:
+            raise ValueError('ColorLine needs at least two positions and '
+                             'one color.')
+        colors = colors[:n_segments]
 
         if colormap is None:
             cm = LinearColormap(['green', 'yellow', 'red'],
-                                vmin=min(colors),
-                                vmax=max(colors),
+                                vmin=colors.min(),
+                                vmax=colors.max(),
                                 ).to_step(nb_steps)
         elif isinstance(colormap, LinearColormap):
             cm = colormap.to_step(nb_steps)
         elif isinstance(colormap, list) or isinstance(colormap, tuple):
             cm = LinearColormap(colormap,
-                                vmin=min(colors),
-                                vmax=max(colors),
+                                vmin=colors.min(),
+                                vmax=colors.max(),
                                 ).to_step(nb_steps)
         else:
             cm = colormap
-        out = {}
-        for (lat1, lng1), (lat2, lng2), color in zip(positions[:-1], positions[1:], colors):  # noqa
-            out.setdefault(cm(color), []).append([[lat1, lng1], [lat2, lng2]])
-        for key, val in out.items():
-            self.add_child(PolyLine(val, color=key, weight=weight, opacity=opacity))  # noqa
+        palette, codes = _get_colormap_lut(cm, colors)
+
+        # Runs of consecutive segments with the same color, as point ranges.
+        breaks = np.flatnonzero(codes[1:] != codes[:-1]) + 1
+        starts = np.concatenate([[0], breaks])
+        stops = np.concatenate([breaks, [n_segments]]) + 1
+        run_codes = codes[starts]
+        _, first_runs = np.unique(run_codes, return_index=True)
+        for code in run_codes[np.sort(first_runs)]:
+            runs = np.flatnonzero(run_codes == code)
+            lines = [positions[starts[i]:stops[i]] for i in runs]
+            self.add_child(PolyLine(lines, color=palette[code],
+                                    weight=weight, opacity=opacity))
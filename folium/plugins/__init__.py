@@ -19,6 +19,7 @@ from folium.plugins.feature_group_sub_group import FeatureGroupSubGroup
 from folium.plugins.float_image import FloatImage
 from folium.plugins.fullscreen import Fullscreen
 from folium.plugins.heat_map import HeatMap
+from folium.plugins.heat_map_overlay import HeatMapOverlay
 from folium.plugins.heat_map_withtime import HeatMapWithTime
 from folium.plugins.locate_control import LocateControl
 from folium.plugins.marker_cluster import MarkerCluster
@@ -46,6 +47,7 @@ __all__ = [
     'FloatImage',
     'Fullscreen',
     'HeatMap',
+    'HeatMapOverlay',
     'HeatMapWithTime',
     'LocateControl',
     'MarkerCluster',
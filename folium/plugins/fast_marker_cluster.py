@@ -1,10 +1,23 @@
 # -*- coding: utf-8 -*-
 
 from folium.plugins.marker_cluster import MarkerCluster
-from folium.utilities import if_pandas_df_convert_to_numpy, validate_location
+from branca.element import Figure
+
+from folium.utilities import (
+    add_decode_rows_script,
+    cluster_points,
+    encode_rows,
+    if_arrow_convert_to_numpy,
+    if_pandas_df_convert_to_numpy,
+    is_numeric_array,
+    validate_location,
+    validate_location_array,
+)
 
 from jinja2 import Template
 
+import numpy as np
+
 
 class FastMarkerCluster(MarkerCluster):
     """
@@ -24,6 +37,10 @@ class FastMarkerCluster(MarkerCluster):
         List of list of shape [[lat, lon], [lat, lon], etc.]
         When you use a custom callback you could add more values after the
         lat and lon. E.g. [[lat, lon, 'red'], [lat, lon, 'blue']]
+        You can also provide a pyarrow Table with point geometries or the
+        path of a GeoParquet file, see `columns`. Numeric arrays and DataFrames are
+        validated and stored as an array in one go, and embedded in binary
+        form, which scales to millions of points.
     callback: string, optional
         A string representation of a valid Javascript function
         that will be passed each row in data. See the
@@ -39,6 +56,18 @@ class FastMarkerCluster(MarkerCluster):
     icon_create_function : string, default None
         Override the default behaviour, making possible to customize
         markers colors and sizes.
+    precluster: bool, default False
+        Compute the clusters in Python for every zoom level instead of in
+        the browser. Only the cluster locations and counts of the current
+        zoom level are drawn, and points that are alone in their cluster
+        are passed to the callback. Use this for very large datasets.
+        The `max_cluster_radius` (default 80 pixels) and
+        `disable_clustering_at_zoom` (default 18) options are honored,
+        other Leaflet.markercluster options are ignored.
+    columns: list of str, default None
+        With a pyarrow Table or GeoParquet file, the columns that follow lat
+        and lon in the rows passed to the callback. Other columns are not
+        loaded.
     **kwargs
         Additional arguments are passed to Leaflet.markercluster options. See
         https://github.com/Leaflet/Leaflet.markercluster
@@ -49,7 +78,11 @@ class FastMarkerCluster(MarkerCluster):
             var {{ this.get_name() }} = (function(){
                 {{ this.callback }}
 
+                {%- if this.encoded_data is not none %}
+                var data = foliumDecodeRows({{ this.encoded_data|tojson }}, {{ this.data.shape[1] }});
+                {%- else %}
                 var data = {{ this.data|tojson }};
+                {%- endif %}
                 var cluster = L.markerClusterGroup({{ this.options|tojson }});
                 {%- if this.icon_create_function is not none %}
                 cluster.options.iconCreateFunction =
@@ -67,8 +100,80 @@ class FastMarkerCluster(MarkerCluster):
             })();
         {% endmacro %}""")
 
+    _precluster_template = Template(u"""
+        {% macro script(this, kwargs) %}
+            var {{ this.get_name() }} = (function(){
+                {{ this.callback }}
+
+                {%- if this.encoded_data is not none %}
+                var data = foliumDecodeRows({{ this.encoded_data|tojson }}, {{ this.data.shape[1] }});
+                {%- else %}
+                var data = {{ this.data|tojson }};
+                {%- endif %}
+                var clusters = {{ this.clusters|tojson }};
+                var leafZoom = {{ this.leaf_zoom|tojson }};
+                var minZoom = {{ this.min_zoom }}, maxZoom = {{ this.max_zoom }};
+                var layer = L.featureGroup();
+                var leaves = [];
+                var map = null;
+                {%- if this.icon_create_function is not none %}
+                var iconCreateFunction = {{ this.icon_create_function.strip() }};
+                {%- else %}
+                var iconCreateFunction = function (cluster) {
+                    var count = cluster.getChildCount();
+                    var size = count < 10 ? 'small' : count < 100 ? 'medium' : 'large';
+                    return new L.DivIcon({
+                        html: '<div><span>' + count + '</span></div>',
+                        className: 'marker-cluster marker-cluster-' + size,
+                        iconSize: new L.Point(40, 40)
+                    });
+                };
+                {%- endif %}
+
+                function clusterMarker(row, zoom) {
+                    var cluster = {getChildCount: function () { return row[2]; }};
+                    var marker = L.marker([row[0], row[1]],
+                                          {icon: iconCreateFunction(cluster)});
+                    marker.on('click', function () {
+                        map.setView(marker.getLatLng(), zoom + 1);
+                    });
+                    return marker;
+                }
+
+                function update() {
+                    var zoom = Math.max(Math.min(Math.round(map.getZoom()), maxZoom + 1), minZoom);
+                    var bounds = map.getBounds().pad(0.2);
+                    layer.clearLayers();
+                    (clusters[zoom] || []).forEach(function (row) {
+                        if (bounds.contains([row[0], row[1]])) {
+                            layer.addLayer(clusterMarker(row, zoom));
+                        }
+                    });
+                    for (var i = 0; i < data.length; i++) {
+                        if (leafZoom[i] <= zoom && bounds.contains([data[i][0], data[i][1]])) {
+                            leaves[i] = leaves[i] || callback(data[i]);
+                            layer.addLayer(leaves[i]);
+                        }
+                    }
+                }
+
+                layer.on('add', function () {
+                    map = layer._map;
+                    map.on('moveend', update);
+                    update();
+                });
+                layer.on('remove', function () {
+                    map.off('moveend', update);
+                });
+
+                layer.addTo({{ this._parent.get_name() }});
+                return layer;
+            })();
+        {% endmacro %}""")
+
     def __init__(self, data, callback=None, options=None,
-                 name=None, overlay=True, control=True, show=True, icon_create_function=None, **kwargs):
+                 name=None, overlay=True, control=True, show=True, icon_create_function=None,
+                 precluster=False, columns=None, **kwargs):
         if options is not None:
             kwargs.update(options)  # options argument is legacy
         super(FastMarkerCluster, self).__init__(name=name, overlay=overlay,
@@ -76,9 +181,15 @@ class FastMarkerCluster(MarkerCluster):
                                                 icon_create_function=icon_create_function,
                                                 **kwargs)
         self._name = 'FastMarkerCluster'
-        data = if_pandas_df_convert_to_numpy(data)
-        self.data = [[*validate_location(row[:2]), *row[2:]]  # noqa: E999
-                     for row in data]
+        data = if_pandas_df_convert_to_numpy(
+            if_arrow_convert_to_numpy(data, columns=columns))
+        if is_numeric_array(data) and len(data):
+            self.data = validate_location_array(
+                data, n_columns=range(2, max(np.shape(data)[-1], 2) + 1))
+        else:
+            self.data = [[*validate_location(row[:2]), *row[2:]]  # noqa: E999
+                         for row in data]
+        self.encoded_data = None
 
         if callback is None:
             self.callback = """
@@ -90,3 +201,32 @@ class FastMarkerCluster(MarkerCluster):
                 };"""
         else:
             self.callback = 'var callback = {};'.format(callback)
+
+        if precluster:
+            self._template = self._precluster_template
+            radius = self.options.get('maxClusterRadius', 80)
+            self.min_zoom = 0
+            self.max_zoom = self.options.get('disableClusteringAtZoom', 18) - 1
+            locations = (self.data[:, :2] if isinstance(self.data, np.ndarray)
+                         else [row[:2] for row in self.data])
+            clusters, leaf_zoom = cluster_points(
+                locations, min_zoom=self.min_zoom,
+                max_zoom=self.max_zoom, radius=radius)
+            self.clusters = {
+                zoom: [[round(lat, 6), round(lng, 6), int(count)]
+                       for lat, lng, count in rows.tolist()]
+                for zoom, rows in clusters.items()
+            }
+            self.leaf_zoom = leaf_zoom.tolist()
+
+    def render(self, **kwargs):
+        if isinstance(self.data, np.ndarray):
+            self.encoded_data = encode_rows(self.data)
+        super(FastMarkerCluster, self).render(**kwargs)
+        self.encoded_data = None
+
+        figure = self.get_root()
+        assert isinstance(figure, Figure), ('You cannot render this Element '
+                                            'if it is not in a Figure.')
+        if isinstance(self.data, np.ndarray):
+            add_decode_rows_script(figure)
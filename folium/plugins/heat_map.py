@@ -4,11 +4,17 @@ from branca.element import Figure, JavascriptLink
 
 from folium.map import Layer
 from folium.utilities import (
+    add_decode_rows_script,
+    aggregate_points,
+    encode_rows,
+    is_numeric_array,
     none_max,
     none_min,
     parse_options,
+    if_arrow_convert_to_numpy,
     if_pandas_df_convert_to_numpy,
     validate_location,
+    validate_location_array,
 )
 
 from jinja2 import Template
@@ -24,7 +30,13 @@ class HeatMap(Layer):
     ----------
     data : list of points of the form [lat, lng] or [lat, lng, weight]
         The points you want to plot.
-        You can also provide a numpy.array of shape (n,2) or (n,3).
+        You can also provide a numpy.array of shape (n,2) or (n,3), a
+        pyarrow Table with point geometries or the path of a GeoParquet
+        file, see `weight_column`.
+        Numeric arrays and DataFrames are validated and stored as an array
+        in one go, and embedded in binary form, which scales to millions
+        of points. The `data` attribute is then a numpy array of floats
+        instead of a list.
     name : string, default None
         The name of the Layer, as it will appear in LayerControls.
     min_opacity  : default 1.
@@ -46,25 +58,88 @@ class HeatMap(Layer):
         Whether the Layer will be included in LayerControls.
     show: bool, default True
         Whether the layer will be shown on opening (only for overlays).
+    aggregate: bool, default False
+        Sum the points over a grid for every zoom level up to `max_zoom`
+        in Python, and only embed the grid cells. The browser draws the
+        cells of the current zoom level, which keeps layers with millions
+        of points responsive.
+    cell_size: int, default None
+        Size in pixels of the grid cells when aggregating. Defaults to
+        `(radius + blur) / 2`, the grid Leaflet.heat uses itself.
+    max_points: int, default 100000
+        When aggregating, keep at most this many cells per zoom level, those
+        with the largest weights. The lightest cells are left out.
+    weight_column: str, default None
+        With a pyarrow Table or GeoParquet file, the column with the weights
+        of the points. Other columns are not loaded.
     """
     _template = Template(u"""
         {% macro script(this, kwargs) %}
+            {%- if this.encoded_levels is not none %}
+            var {{ this.get_name() }} = L.heatLayer([], {{ this.options|tojson }});
+            (function (layer) {
+                var levels = {{ this.encoded_levels|tojson }};
+                var zooms = Object.keys(levels).map(Number).sort(function (a, b) {
+                    return a - b;
+                });
+                var decoded = {};
+                var map = null;
+                function update() {
+                    var zoom = Math.round(map.getZoom());
+                    var level = zooms[0];
+                    zooms.forEach(function (z) {
+                        if (z <= zoom) { level = z; }
+                    });
+                    if (!(level in decoded)) {
+                        decoded[level] = foliumDecodeRows(levels[level], 3);
+                    }
+                    layer.setLatLngs(decoded[level]);
+                }
+                layer.on('add', function () {
+                    map = layer._map;
+                    map.on('zoomend', update);
+                    update();
+                });
+                layer.on('remove', function () {
+                    map.off('zoomend', update);
+                });
+            })({{ this.get_name() }});
+            {{ this.get_name() }}.addTo({{ this._parent.get_name() }});
+            {%- else %}
             var {{ this.get_name() }} = L.heatLayer(
+                {%- if this.encoded_data is not none %}
+                foliumDecodeRows({{ this.encoded_data|tojson }}, {{ this.data.shape[1] }}),
+                {%- else %}
                 {{ this.data|tojson }},
+                {%- endif %}
                 {{ this.options|tojson }}
             ).addTo({{ this._parent.get_name() }});
+            {%- endif %}
         {% endmacro %}
         """)
 
     def __init__(self, data, name=None, min_opacity=0.5, max_zoom=18,
                  max_val=1.0, radius=25, blur=15, gradient=None,
-                 overlay=True, control=True, show=True, **kwargs):
+                 overlay=True, control=True, show=True, aggregate=False,
+                 cell_size=None, max_points=100000, weight_column=None,
+                 **kwargs):
         super(HeatMap, self).__init__(name=name, overlay=overlay,
                                       control=control, show=show)
         self._name = 'HeatMap'
+        data = if_arrow_convert_to_numpy(
+            data, columns=[weight_column] if weight_column is not None else None)
         data = if_pandas_df_convert_to_numpy(data)
-        self.data = [[*validate_location(line[:2]), *line[2:]]  # noqa: E999
-                     for line in data]
+        if is_numeric_array(data) and len(data):
+            self.data = validate_location_array(
+                data, n_columns=range(2, max(np.shape(data)[-1], 2) + 1))
+        else:
+            self.data = [[*validate_location(line[:2]), *line[2:]]  # noqa: E999
+                         for line in data]
+        self.encoded_data = None
+        self.encoded_levels = None
+        self.aggregate = aggregate
+        self.cell_size = cell_size or (radius + blur) / 2
+        self.max_points = max_points
         if np.any(np.isnan(self.data)):
             raise ValueError('data may not contain NaNs.')
         self.options = parse_options(
@@ -78,12 +153,24 @@ class HeatMap(Layer):
         )
 
     def render(self, **kwargs):
+        if self.aggregate:
+            levels = aggregate_points(
+                self.data, max_zoom=self.options['maxZoom'],
+                cell_size=self.cell_size, max_points=self.max_points)
+            self.encoded_levels = {zoom: encode_rows(rows)
+                                   for zoom, rows in levels.items()}
+        elif isinstance(self.data, np.ndarray):
+            self.encoded_data = encode_rows(self.data)
         super(HeatMap, self).render(**kwargs)
+        self.encoded_data = self.encoded_levels = None
 
         figure = self.get_root()
         assert isinstance(figure, Figure), ('You cannot render this Element '
                                             'if it is not in a Figure.')
 
+        if self.aggregate or isinstance(self.data, np.ndarray):
+            add_decode_rows_script(figure)
+
         figure.header.add_child(
             JavascriptLink('https://leaflet.github.io/Leaflet.heat/dist/leaflet-heat.js'),  # noqa
             name='leaflet-heat.js')
@@ -94,6 +181,10 @@ class HeatMap(Layer):
         in the form [[lat_min, lon_min], [lat_max, lon_max]].
 
         """
+        if isinstance(self.data, np.ndarray):
+            lat_min, lon_min = self.data[:, :2].min(axis=0).tolist()
+            lat_max, lon_max = self.data[:, :2].max(axis=0).tolist()
+            return [[lat_min, lon_min], [lat_max, lon_max]]
         bounds = [[None, None], [None, None]]
         for point in self.data:
             bounds = [
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+from branca.colormap import LinearColormap
+
+from folium.raster_layers import ImageOverlay
+from folium.utilities import (
+    if_arrow_convert_to_numpy,
+    if_pandas_df_convert_to_numpy,
+    kernel_density,
+    validate_location_array,
+)
+
+import numpy as np
+
+
+class HeatMapOverlay(ImageOverlay):
+    """
+    Create a heatmap rendered as an image in Python.
+
+    The density of the points is estimated with a Gaussian kernel on a Web
+    Mercator grid, colored through the gradient and displayed as an
+    ImageOverlay. The browser only draws one image, so its cost does not
+    depend on the number of points.
+
+    Parameters
+    ----------
+    data : list of points of the form [lat, lng] or [lat, lng, weight]
+        The points you want to plot, as for HeatMap.
+        You can also provide a numpy.array of shape (n,2) or (n,3), a
+        DataFrame, a pyarrow Table with point geometries or the path of a
+        GeoParquet file, see `weight_column`.
+    bounds : list, default None
+        Area of the image in the form [[lat_min, lon_min], [lat_max, lon_max]].
+        Defaults to the bounds of the points with a margin for the kernel.
+    width : int, default 1024
+        Width of the image in pixels. The height follows from the bounds.
+    radius : float, default 10
+        Standard deviation of the kernel, in pixels of the image.
+    max_val : float, default None
+        Density shown with the last color of the gradient, higher densities
+        are clipped. Defaults to the highest density.
+    gradient : dict, default None
+        Color gradient config. e.g. {0.4: 'blue', 0.65: 'lime', 1: 'red'}
+        Defaults to the gradient of HeatMap.
+    name : string, default None
+        The name of the Layer, as it will appear in LayerControls.
+    overlay : bool, default True
+        Adds the layer as an optional overlay (True) or the base layer (False).
+    control : bool, default True
+        Whether the Layer will be included in LayerControls.
+    show: bool, default True
+        Whether the layer will be shown on opening (only for overlays).
+    weight_column: str, default None
+        With a pyarrow Table or GeoParquet file, the column with the weights
+        of the points. Other columns are not loaded.
+    **kwargs
+        Other Leaflet ImageOverlay options, like opacity.
+
+    """
+    default_gradient = {0.4: 'blue', 0.6: 'cyan', 0.7: 'lime', 0.8: 'yellow',
+                        1.0: 'red'}
+
+    def __init__(self, data, bounds=None, width=1024, radius=10, max_val=None,
+                 gradient=None, name=None, overlay=True, control=True,
+                 show=True, weight_column=None, **kwargs):
+        data = if_arrow_convert_to_numpy(
+            data, columns=[weight_column] if weight_column is not None else None)
+        data = if_pandas_df_convert_to_numpy(data)
+        data = validate_location_array(data, n_columns=(2, 3))
+        if np.isnan(data).any():
+            raise ValueError('data may not contain NaNs.')
+        density, bounds = kernel_density(data, bounds=bounds, width=width,
+                                         radius=radius)
+        image = self._colorize(density, max_val, gradient or self.default_gradient)
+        super(HeatMapOverlay, self).__init__(
+            image, bounds, pixelated=False, name=name, overlay=overlay,
+            control=control, show=show, **kwargs)
+        self._name = 'HeatMapOverlay'
+
+    @staticmethod
+    def _colorize(density, max_val, gradient):
+        """Return an RGBA image, with the density as index in the gradient and alpha."""
+        intensity = np.clip(density / (max_val or density.max() or 1), 0, 1)
+        stops = sorted(gradient)
+        colormap = LinearColormap([gradient[stop] for stop in stops], index=stops,
+                                  vmin=stops[0], vmax=stops[-1])
+        levels = np.linspace(0, 1, 256)
+        lut = np.array([colormap.rgba_floats_tuple(level) for level in levels])
+        lut[:, 3] *= levels
+        image = lut[np.round(intensity * 255).astype(np.intp)]
+        return np.round(image * 255).astype(np.uint8)
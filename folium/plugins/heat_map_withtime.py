@@ -1,12 +1,21 @@
 # -*- coding: utf-8 -*-
 
+import os
+
 from branca.element import CssLink, Element, Figure, JavascriptLink
 
 from folium.map import Layer
-from folium.utilities import none_max, none_min
+from folium.utilities import (
+    add_decode_rows_script,
+    encode_rows,
+    if_pandas_df_convert_to_numpy,
+    validate_location_array,
+)
 
 from jinja2 import Template
 
+import numpy as np
+
 
 class HeatMapWithTime(Layer):
     """
@@ -56,6 +65,22 @@ class HeatMapWithTime(Layer):
         Whether the Layer will be included in LayerControls.
     show: bool, default True
         Whether the layer will be shown on opening (only for overlays).
+    compact: bool, default False
+        Store every frame as an array and embed it as a float32 typed
+        array instead of nested lists. Frames may also be numpy arrays or
+        DataFrames. In the browser frames are decoded once and cached.
+    frames_dir: str, default None
+        Write every frame to a binary file in this directory instead of
+        embedding it, and load frames lazily in the browser. Implies
+        `compact`. The page has to be served over http(s) for the browser
+        to load them.
+    frames_url: str, default None
+        URL of `frames_dir` as seen from the page, defaults to `frames_dir`.
+    prefetch: int, default 2
+        With `compact`, number of frames after the current one to load
+        and decode ahead of time.
+    cache_size: int, default 16
+        With `compact`, number of decoded frames kept in the browser.
 
     """
     _template = Template(u"""
@@ -89,7 +114,8 @@ class HeatMapWithTime(Layer):
                 })
                 .addTo({{this._parent.get_name()}});
 
-                var {{this.get_name()}} = new TDHeatmap({{this.data}},
+                var {{this.get_name()}} = new TDHeatmap(
+                {%- if this.compact %}{{ this.encoded_frames|tojson }}{% else %}{{this.data}}{% endif %},
                 {heatmapOptions: {
                         radius: {{this.radius}},
                         minOpacity: {{this.min_opacity}},
@@ -99,6 +125,12 @@ class HeatMapWithTime(Layer):
                         defaultWeight: 1,
                         {% if this.gradient %}gradient: {{ this.gradient }}{% endif %}
                     }
+                    {%- if this.compact %},
+                    frameUrl: {{ this.frame_url|tojson }},
+                    nFrames: {{ this.data|length }},
+                    prefetch: {{ this.prefetch }},
+                    cacheSize: {{ this.cache_size }}
+                    {%- endif %}
                 })
                 .addTo({{this._parent.get_name()}});
 
@@ -110,14 +142,22 @@ class HeatMapWithTime(Layer):
                  use_local_extrema=False, auto_play=False,
                  display_index=True, index_steps=1, min_speed=0.1,
                  max_speed=10, speed_step=0.1, position='bottomleft',
-                 overlay=True, control=True, show=True):
+                 overlay=True, control=True, show=True, compact=False,
+                 frames_dir=None, frames_url=None, prefetch=2, cache_size=16):
         super(HeatMapWithTime, self).__init__(name=name, overlay=overlay,
                                               control=control, show=show)
         self._name = 'HeatMap'
         self._control_name = self.get_name() + 'Control'
 
         # Input data.
-        self.data = data
+        self.compact = compact or frames_dir is not None
+        self.data = [self._to_frame(frame) for frame in data] if self.compact else data
+        self.frames_dir = frames_dir
+        self.frames_url = frames_url
+        self.prefetch = prefetch
+        self.cache_size = max(cache_size, prefetch + 1)
+        self.encoded_frames = self.frame_url = None
+        self._bounds = None
         self.index = index if index is not None else [str(i) for i in
                                                       range(1, len(data)+1)]
         if len(self.data) != len(self.index):
@@ -154,13 +194,45 @@ class HeatMapWithTime(Layer):
         self.time_slider_drap_update = 'false'
         self.style_NS = 'leaflet-control-timecontrol'
 
+    @staticmethod
+    def _to_frame(frame):
+        """Return a frame as an array with lat, lng and weight columns."""
+        frame = if_pandas_df_convert_to_numpy(frame)
+        if len(frame) == 0:
+            return np.empty((0, 3))
+        frame = validate_location_array(frame, n_columns=(2, 3))
+        if frame.shape[1] == 2:
+            frame = np.column_stack([frame, np.ones(len(frame))])
+        return frame
+
+    def _write_frames(self):
+        """Write every frame as float32 values to a file in frames_dir."""
+        os.makedirs(self.frames_dir, exist_ok=True)
+        for i, frame in enumerate(self.data):
+            path = os.path.join(self.frames_dir,
+                                '{}_{}.bin'.format(self.get_name(), i))
+            with open(path, 'wb') as f:
+                f.write(np.ascontiguousarray(frame, dtype='<f4').tobytes())
+        url = self.frames_url or self.frames_dir.replace(os.sep, '/')
+        self.frame_url = '{}/{}_{{index}}.bin'.format(url.rstrip('/'),
+                                                      self.get_name())
+
     def render(self, **kwargs):
+        if self.frames_dir is not None:
+            self._write_frames()
+        elif self.compact:
+            self.encoded_frames = [encode_rows(frame, dtype='<f4')
+                                   for frame in self.data]
         super(HeatMapWithTime, self).render(**kwargs)
+        self.encoded_frames = None
 
         figure = self.get_root()
         assert isinstance(figure, Figure), ('You cannot render this Element '
                                             'if it is not in a Figure.')
 
+        if self.compact and self.frames_dir is None:
+            add_decode_rows_script(figure)
+
         figure.header.add_child(
             JavascriptLink('https://rawcdn.githack.com/socib/Leaflet.TimeDimension/master/dist/leaflet.timedimension.min.js'),  # noqa
             name='leaflet.timedimension.min.js')
@@ -204,6 +276,12 @@ class HeatMapWithTime(Layer):
                     };
                 this.data= data;
                 this.defaultWeight = heatmapCfg.defaultWeight || 1;
+                this._frameUrl = options.frameUrl || null;
+                this._nFrames = options.nFrames || (data ? data.length : 0);
+                this._prefetch = options.prefetch || 0;
+                this._cacheSize = options.cacheSize || 1;
+                this._frames = {};
+                this._frameOrder = [];
             },
             onAdd: function(map) {
                 L.TimeDimension.Layer.prototype.onAdd.call(this, map);
@@ -224,16 +302,22 @@ class HeatMapWithTime(Layer):
                 return true;
             },
             _getDataForTime: function(time) {
-                    delete this._currentTimeData.data;
-                    this._currentTimeData.data = [];
-                    var data = this.data[time-1];
-                    for (var i = 0; i < data.length; i++) {
-                        this._currentTimeData.data.push({
-                                lat: data[i][0],
-                                lng: data[i][1],
-                                count: data[i].length>2 ? data[i][2] : this.defaultWeight
-                            });
+                    if (this._frameUrl === null && typeof this.data[time-1] !== 'string') {
+                        this._setDataForTime(time, this._rowsToPoints(this.data[time-1]));
+                        return;
+                    }
+                    var self = this;
+                    this._loadFrame(time, function (points) {
+                        self._setDataForTime(time, points);
+                    });
+                    setTimeout(function () {
+                        for (var next = time + 1; next <= Math.min(time + self._prefetch, self._nFrames); next++) {
+                            self._loadFrame(next);
                         }
+                    }, 0);
+                },
+            _setDataForTime: function(time, points) {
+                    this._currentTimeData.data = points;
                     this._currentLoadedTime = time;
                     if (this._timeDimension && time == this._timeDimension.getCurrentTime() && !this._timeDimension.isLoading()) {
                         this._update();
@@ -241,6 +325,56 @@ class HeatMapWithTime(Layer):
                     this.fire('timeload', {
                         time: time
                     });
+                },
+            _rowsToPoints: function(data) {
+                    var points = [];
+                    for (var i = 0; i < data.length; i++) {
+                        points.push({
+                                lat: data[i][0],
+                                lng: data[i][1],
+                                count: data[i].length>2 ? data[i][2] : this.defaultWeight
+                            });
+                        }
+                    return points;
+                },
+            _valuesToPoints: function(values) {
+                    var points = new Array(values.length / 3);
+                    for (var i = 0; i < points.length; i++) {
+                        points[i] = {lat: values[3*i], lng: values[3*i+1], count: values[3*i+2]};
+                    }
+                    return points;
+                },
+            _loadFrame: function(time, callback) {
+                    var self = this;
+                    var frame = this._frames[time];
+                    if (frame === undefined) {
+                        if (this._frameUrl !== null) {
+                            frame = fetch(this._frameUrl.replace('{index}', time - 1))
+                                .then(function (response) { return response.arrayBuffer(); })
+                                .then(function (buffer) {
+                                    var points = self._valuesToPoints(new Float32Array(buffer));
+                                    if (self._frames[time] !== undefined) {
+                                        self._frames[time] = points;
+                                    }
+                                    return points;
+                                });
+                        } else {
+                            frame = this._valuesToPoints(
+                                foliumDecodeArray(this.data[time-1], Float32Array));
+                        }
+                        this._frames[time] = frame;
+                        this._frameOrder.push(time);
+                        while (this._frameOrder.length > this._cacheSize) {
+                            delete this._frames[this._frameOrder.shift()];
+                        }
+                    }
+                    if (callback) {
+                        if (typeof frame.then === 'function') {
+                            frame.then(callback);
+                        } else {
+                            callback(frame);
+                        }
+                    }
                 }
         });
 
@@ -269,17 +403,27 @@ class HeatMapWithTime(Layer):
         Computes the bounds of the object itself (not including it's children)
         in the form [[lat_min, lon_min], [lat_max, lon_max]].
 
+        The bounds cover the points of every frame, and are cached.
+
         """
-        bounds = [[None, None], [None, None]]
-        for point in self.data:
-            bounds = [
-                [
-                    none_min(bounds[0][0], point[0]),
-                    none_min(bounds[0][1], point[1]),
-                ],
-                [
-                    none_max(bounds[1][0], point[0]),
-                    none_max(bounds[1][1], point[1]),
-                ],
-            ]
-        return bounds
+        if self._bounds is None:
+            coords = np.concatenate([self._get_frame_coordinates(frame)
+                                     for frame in self.data] or [np.empty((0, 2))])
+            if len(coords) == 0:
+                return [[None, None], [None, None]]
+            lat_min, lon_min = np.nanmin(coords, axis=0).tolist()
+            lat_max, lon_max = np.nanmax(coords, axis=0).tolist()
+            self._bounds = [[lat_min, lon_min], [lat_max, lon_max]]
+        return self._bounds
+
+    @staticmethod
+    def _get_frame_coordinates(frame):
+        """Return the lat and lng of the points of a frame as an array."""
+        try:
+            coords = np.asarray(frame, dtype=float)
+        except ValueError:
+            # Points with and without weight.
+            coords = np.asarray([point[:2] for point in frame], dtype=float)
+        if coords.size == 0:
+            return np.empty((0, 2))
+        return coords.reshape(len(coords), -1)[:, :2]
@@ -1,12 +1,21 @@
 # -*- coding: utf-8 -*-
 
+import json
+
 from branca.element import CssLink, Figure, JavascriptLink
 
-from folium.map import Layer, Marker
-from folium.utilities import validate_locations, parse_options
+from folium.map import Icon, Layer, Marker, Popup
+from folium.utilities import (
+    factorize,
+    parse_options,
+    validate_location_array,
+    validate_locations,
+)
 
 from jinja2 import Template
 
+import numpy as np
+
 
 class MarkerCluster(Layer):
     """
@@ -34,6 +43,12 @@ class MarkerCluster(Layer):
     options : dict, default None
         A dictionary with options for Leaflet.markercluster. See
         https://github.com/Leaflet/Leaflet.markercluster for options.
+    bulk : bool, default False
+        Store the locations, popups and icons as arrays and create the
+        markers in a single loop in the browser, instead of adding a
+        Marker element per location. Much faster for many markers. In this
+        mode popups must be strings (HTML) or None, and icons Icon objects,
+        dicts of Icon arguments, icon names or None.
 
     Example
     -------
@@ -56,19 +71,46 @@ class MarkerCluster(Layer):
                 {{ this.icon_create_function.strip() }};
             {%- endif %}
             {{ this._parent.get_name() }}.addLayer({{ this.get_name() }});
+            {%- if this.locations is not none %}
+            (function(){
+                var locations = {{ this.locations.tolist()|tojson }};
+                var popups = {{ this.popups|tojson }};
+                var iconCodes = {{ this.icon_codes|tojson }};
+                var icons = ({{ this.icons|tojson }} || []).map(function (options) {
+                    return options && L.AwesomeMarkers.icon(options);
+                });
+                var markers = new Array(locations.length);
+                for (var i = 0; i < locations.length; i++) {
+                    var marker = L.marker(locations[i]);
+                    if (iconCodes && icons[iconCodes[i]]) {
+                        marker.setIcon(icons[iconCodes[i]]);
+                    }
+                    if (popups && popups[i] !== null) {
+                        marker.bindPopup(popups[i]);
+                    }
+                    markers[i] = marker;
+                }
+                {{ this.get_name() }}.addLayers(markers);
+            })();
+            {%- endif %}
         {% endmacro %}
         """)
 
     def __init__(self, locations=None, popups=None, icons=None, name=None,
                  overlay=True, control=True, show=True,
-                 icon_create_function=None, options=None, **kwargs):
+                 icon_create_function=None, options=None, bulk=False, **kwargs):
         if options is not None:
             kwargs.update(options)  # options argument is legacy
         super(MarkerCluster, self).__init__(name=name, overlay=overlay,
                                             control=control, show=show)
         self._name = 'MarkerCluster'
 
-        if locations is not None:
+        self.locations = None
+        if locations is not None and bulk:
+            self.locations = validate_location_array(locations)
+            self.popups = self._get_bulk_popups(popups)
+            self.icon_codes, self.icons = self._get_bulk_icons(icons)
+        elif locations is not None:
             locations = validate_locations(locations)
             for i, location in enumerate(locations):
                 self.add_child(Marker(location,
@@ -80,6 +122,55 @@ class MarkerCluster(Layer):
             assert isinstance(icon_create_function, str)
         self.icon_create_function = icon_create_function
 
+    def _check_length(self, values, name):
+        if len(values) != len(self.locations):
+            raise ValueError('Expected one item in {} per location, got {} '
+                             'for {} locations.'
+                             .format(name, len(values), len(self.locations)))
+
+    def _get_bulk_popups(self, popups):
+        """Return the popups as a list of HTML strings or None."""
+        if popups is None:
+            return None
+        self._check_length(popups, 'popups')
+        if any(isinstance(popup, Popup) for popup in popups):
+            raise TypeError('Popup objects are not supported with bulk=True, '
+                            'pass the popup contents as strings.')
+        return [None if popup is None else str(popup) for popup in popups]
+
+    def _get_bulk_icons(self, icons):
+        """Return an icon code per location and the options of each icon."""
+        if icons is None:
+            return None, None
+        self._check_length(icons, 'icons')
+        keys = [icon if icon is None or isinstance(icon, str)
+                else json.dumps(icon.options if isinstance(icon, Icon) else icon,
+                                sort_keys=True)
+                for icon in icons]
+        codes, _ = factorize(keys)
+        _, first = np.unique(codes, return_index=True)
+        palette = []
+        for i in first:
+            icon = icons[i]
+            if isinstance(icon, str):
+                icon = Icon(icon=icon)
+            elif isinstance(icon, dict):
+                icon = Icon(**icon)
+            palette.append(None if icon is None else icon.options)
+        # Different specs can give the same icon, an Icon and a dict say.
+        merged, _ = factorize([options and json.dumps(options, sort_keys=True)
+                               for options in palette])
+        _, first = np.unique(merged, return_index=True)
+        return merged[codes].tolist(), [palette[i] for i in first]
+
+    def _get_self_bounds(self):
+        """Compute the bounds of the bulk locations."""
+        if self.locations is None:
+            return [[None, None], [None, None]]
+        lat_min, lon_min = self.locations.min(axis=0).tolist()
+        lat_max, lon_max = self.locations.max(axis=0).tolist()
+        return [[lat_min, lon_min], [lat_max, lon_max]]
+
     def render(self, **kwargs):
         super(MarkerCluster, self).render(**kwargs)
 
@@ -95,6 +95,9 @@ class Search(MacroElement):
                              'this time.'
         self.layer = layer
         self.search_label = search_label
+        if search_label is not None and isinstance(layer, GeoJson):
+            # Keep the label when the layer leaves out unused properties.
+            layer.required_properties.add(search_label)
         self.search_zoom = search_zoom
         self.geom_type = geom_type
         self.position = position
@@ -4,9 +4,12 @@ from branca.element import Figure, JavascriptLink
 
 from folium.features import GeoJson
 from folium.map import Layer
+from folium.utilities import add_decode_rows_script, encode_rows
 
 from jinja2 import Template
 
+import numpy as np
+
 
 class TimeSliderChoropleth(Layer):
     """
@@ -27,14 +30,48 @@ class TimeSliderChoropleth(Layer):
         Whether the Layer will be included in LayerControls.
     show: bool, default True
         Whether the layer will be shown on opening (only for overlays).
+    compact: bool, default False
+        Embed the styles as a palette of distinct styles and a features x
+        timestamps array of indices in that palette, encoded as a typed array,
+        instead of the styledict itself. Much smaller when many features
+        share the same colors.
 
     """
+    _code_types = [('<u1', 'Uint8Array'), ('<u2', 'Uint16Array'),
+                   ('<u4', 'Uint32Array')]
+
     _template = Template(u"""
         {% macro script(this, kwargs) %}
 
             var timestamps = {{ this.timestamps|tojson }};
+            {%- if this.compact %}
+            var feature_ids = {{ this.feature_ids|tojson }};
+            var palette = {{ this.palette|tojson }};
+            var style_codes = foliumDecodeArray({{ this.encoded_codes|tojson }},
+                                                {{ this.codes_type }});
+            {%- else %}
             var styledict = {{ this.styledict|tojson }};
+            var feature_ids = Object.keys(styledict);
+            {%- endif %}
             var current_timestamp = timestamps[0];
+            var current_index = 0;
+
+            function get_style(i, index) {
+                {%- if this.compact %}
+                var code = style_codes[i * timestamps.length + index];
+                return code === {{ this.missing_code }} ? undefined : palette[code];
+                {%- else %}
+                return styledict[feature_ids[i]][timestamps[index]];
+                {%- endif %}
+            }
+
+            // layers of every feature id, and the style they currently have
+            var feature_index = {};
+            var feature_layers = feature_ids.map(function (feature_id, i) {
+                feature_index[feature_id] = i;
+                return [];
+            });
+            var feature_styles = new Array(feature_ids.length);
 
             // insert time slider
             d3.select("body").insert("p", ":first-child").append("input")
@@ -59,22 +96,22 @@ class TimeSliderChoropleth(Layer):
             d3.select("output#slider-value").text(datestring);
 
             fill_map = function(){
-                for (var feature_id in styledict){
-                    let style = styledict[feature_id]//[current_timestamp];
-                    var fillColor = 'white';
-                    var opacity = 0;
-                    if (current_timestamp in style){
-                        fillColor = style[current_timestamp]['color'];
-                        opacity = style[current_timestamp]['opacity'];
-                        d3.selectAll('#feature-'+feature_id
-                        ).attr('fill', fillColor)
-                        .style('fill-opacity', opacity);
+                for (var i = 0; i < feature_layers.length; i++) {
+                    var style = get_style(i, current_index);
+                    if (style !== undefined && style !== feature_styles[i]) {
+                        feature_styles[i] = style;
+                        var options = {fillColor: style['color'],
+                                       fillOpacity: style['opacity']};
+                        for (var j = 0; j < feature_layers[i].length; j++) {
+                            feature_layers[i][j].setStyle(options);
+                        }
                     }
                 }
             }
 
             d3.select("#slider").on("input", function() {
-                current_timestamp = timestamps[this.value];
+                current_index = parseInt(this.value);
+                current_timestamp = timestamps[current_index];
             var datestring = new Date(parseInt(current_timestamp)*1000).toDateString();
             d3.select("output#slider-value").text(datestring);
             fill_map();
@@ -103,7 +140,8 @@ class TimeSliderChoropleth(Layer):
             {% endif %}
 
             var {{ this.get_name() }} = L.geoJson(
-                    {{ this.data|tojson }}
+                    {{ this.data|tojson }},
+                    {style: {color: 'white', weight: 0.8, dashArray: '5,5', fillOpacity: 0}}
             ).addTo({{ this._parent.get_name() }});
 
             {{ this.get_name() }}.setStyle(function(feature) {
@@ -112,6 +150,10 @@ class TimeSliderChoropleth(Layer):
 
             {{ this.get_name() }}.eachLayer(function (layer) {
                 layer._path.id = 'feature-' + layer.feature.id;
+                var i = feature_index[layer.feature.id];
+                if (i !== undefined) {
+                    feature_layers[i].push(layer);
+                }
             });
 
             d3.selectAll('path')
@@ -125,7 +167,7 @@ class TimeSliderChoropleth(Layer):
         """)
 
     def __init__(self, data, styledict, name=None, overlay=True, control=True,
-                 show=True):
+                 show=True, compact=False):
         super(TimeSliderChoropleth, self).__init__(name=name, overlay=overlay,
                                                    control=control, show=show)
         self.data = GeoJson.process_data(GeoJson({}), data)
@@ -144,10 +186,41 @@ class TimeSliderChoropleth(Layer):
 
         self.timestamps = timestamps
         self.styledict = styledict
+        self.compact = compact
+        self.feature_ids = self.palette = self.encoded_codes = None
+        self.codes_type = self.missing_code = None
+
+    @staticmethod
+    def _encode_styledict(styledict, timestamps):
+        """Return the distinct styles and an array of their indices, -1 if missing."""
+        columns = {timestamp: i for i, timestamp in enumerate(timestamps)}
+        palette = {}
+        codes = np.full((len(styledict), len(timestamps)), -1, dtype=np.int64)
+        for row, styles in enumerate(styledict.values()):
+            codes[row, [columns[timestamp] for timestamp in styles]] = [
+                palette.setdefault((style.get('color'), style.get('opacity')),
+                                   len(palette))
+                for style in styles.values()
+            ]
+        palette = [{'color': color, 'opacity': opacity}
+                   for color, opacity in palette]
+        return palette, codes
 
     def render(self, **kwargs):
+        if self.compact:
+            self.feature_ids = list(self.styledict)
+            self.palette, codes = self._encode_styledict(self.styledict,
+                                                         self.timestamps)
+            dtype, self.codes_type = next(
+                (dtype, js_type) for dtype, js_type in self._code_types
+                if len(self.palette) < np.iinfo(dtype).max)
+            self.missing_code = int(np.iinfo(dtype).max)
+            codes[codes < 0] = self.missing_code
+            self.encoded_codes = encode_rows(codes, dtype=dtype)
         super(TimeSliderChoropleth, self).render(**kwargs)
         figure = self.get_root()
         assert isinstance(figure, Figure), ('You cannot render this Element '
                                             'if it is not in a Figure.')
+        if self.compact:
+            add_decode_rows_script(figure)
         figure.header.add_child(JavascriptLink('https://d3js.org/d3.v4.min.js'), name='d3v4')
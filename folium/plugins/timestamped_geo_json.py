@@ -5,10 +5,26 @@ import json
 from branca.element import CssLink, Figure, JavascriptLink, MacroElement
 
 from folium.folium import Map
-from folium.utilities import iter_points, none_max, none_min, parse_options
+from folium.utilities import (
+    factorize,
+    get_url,
+    is_geojson_seq_path,
+    iter_geojson_seq,
+    iter_points,
+    none_max,
+    none_min,
+    parse_options,
+)
 
 from jinja2 import Template
 
+import numpy as np
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
 
 class TimestampedGeoJson(MacroElement):
     """
@@ -37,6 +53,10 @@ class TimestampedGeoJson(MacroElement):
         * If dict, then data will be converted to json and embedded in the
           javascript.
         * If str, then data will be passed to the javascript as-is.
+        * If the path of a newline-delimited GeoJSON file (GeoJSONSeq or
+          NDJSON, e.g. '.geojsonl' or '.ndjson'), a file with such a name
+          or an iterable of features or NDJSON lines, the features are read
+          one at a time and embedded as a FeatureCollection.
     transition_time: int, default 200.
         The duration in ms of a transition from between timestamps.
     loop: bool, default True
@@ -73,6 +93,12 @@ class TimestampedGeoJson(MacroElement):
     ...       ]
     ...     })
 
+    Tracks in a DataFrame, one row per position:
+
+    >>> TimestampedGeoJson.from_dataframe(df, id_column='vehicle',
+    ...                                   time_column='timestamp',
+    ...                                   style_columns={'color': 'line_color'})
+
     See https://github.com/socib/Leaflet.TimeDimension for more information.
 
     """
@@ -125,6 +151,22 @@ class TimestampedGeoJson(MacroElement):
                         }
                     }
                 })
+            {%- if this.tables is not none %}
+
+            var {{ this.get_name() }}_tables = {{ this.tables|tojson }};
+            geoJsonLayer.eachLayer(function (layer) {
+                var tables = {{ this.get_name() }}_tables;
+                var properties = layer.feature.properties;
+                properties.times = properties.times.map(function (i) {
+                    return tables.times[i];
+                });
+                ['style', 'iconstyle'].forEach(function (key) {
+                    if (typeof properties[key] === 'number') {
+                        properties[key] = tables.styles[properties[key]];
+                    }
+                });
+            });
+            {%- endif %}
 
             var {{this.get_name()}} = L.timeDimension.layer.geoJson(
                 geoJsonLayer,
@@ -144,15 +186,30 @@ class TimestampedGeoJson(MacroElement):
         super(TimestampedGeoJson, self).__init__()
         self._name = 'TimestampedGeoJson'
 
-        if 'read' in dir(data):
+        if is_geojson_seq_path(data):
+            self.embed = True
+            if data.lower().startswith(('http:', 'ftp:', 'https:')):
+                f = get_url(data, stream=True)
+            else:
+                f = open(data, 'rb')
+            with f:
+                self.data = self._dump_features(iter_geojson_seq(f))
+        elif 'read' in dir(data) and is_geojson_seq_path(getattr(data, 'name', None)):
+            self.embed = True
+            self.data = self._dump_features(iter_geojson_seq(data))
+        elif 'read' in dir(data):
             self.embed = True
             self.data = data.read()
         elif type(data) is dict:
             self.embed = True
             self.data = json.dumps(data)
+        elif not isinstance(data, str) and hasattr(data, '__iter__'):
+            self.embed = True
+            self.data = self._dump_features(iter_geojson_seq(data))
         else:
             self.embed = False
             self.data = data
+        self.tables = None
         self.add_last_point = bool(add_last_point)
         self.period = period
         self.date_options = date_options
@@ -172,6 +229,115 @@ class TimestampedGeoJson(MacroElement):
             },
         )
 
+    @classmethod
+    def from_dataframe(cls, df, id_column='id', time_column='time',
+                       lat_column='lat', lon_column='lon', style_columns=None,
+                       popup_column=None, icon=None, **kwargs):
+        """Create a TimestampedGeoJson with one track per id from a DataFrame.
+
+        The rows are grouped by id and sorted by time with pandas. Every track
+        becomes a LineString feature, or a Point for a single row. Times are
+        encoded once as ISO strings in a table the features refer to, and so
+        are the distinct styles.
+
+        Parameters
+        ----------
+        df: pandas.DataFrame
+            One row per position.
+        id_column, time_column, lat_column, lon_column: str
+            Names of the columns with the track id, the time (anything
+            `pandas.to_datetime` understands), the latitude and the longitude.
+        style_columns: list or dict, default None
+            Columns with the style of the tracks, as a list of column names
+            used as style keys, or a dict from style key to column name. The
+            first row of a track gives its style.
+        popup_column: str, default None
+            Column with the popup content of the tracks.
+        icon: str, default None
+            'circle' or 'marker', how to draw points. With 'circle' the style
+            of the track is also used for its circle markers.
+        **kwargs
+            Passed to TimestampedGeoJson.
+
+        """
+        if len(df) == 0:
+            raise ValueError('Cannot create tracks from an empty DataFrame.')
+        collection, tables = cls._tracks_to_geojson(
+            df, id_column, time_column, lat_column, lon_column,
+            style_columns, popup_column, icon)
+        obj = cls(collection, **kwargs)
+        obj.tables = tables
+        return obj
+
+    @staticmethod
+    def _tracks_to_geojson(df, id_column, time_column, lat_column, lon_column,
+                           style_columns, popup_column, icon):
+        """Return a FeatureCollection of tracks referring to tables of times and styles."""
+        # Parse the times before sorting, strings don't sort like times.
+        df = df.assign(**{time_column: pd.to_datetime(df[time_column])})
+        df = df.sort_values([id_column, time_column], kind='mergesort')
+        ids = df[id_column].to_numpy()
+        starts = np.flatnonzero(np.concatenate([[True], ids[1:] != ids[:-1]]))
+        stops = np.append(starts[1:], len(df))
+
+        time_codes, time_uniques = pd.factorize(df[time_column])
+        time_uniques = pd.DatetimeIndex(time_uniques)
+        utc = time_uniques.tz is not None
+        if utc:
+            time_uniques = time_uniques.tz_convert('UTC').tz_localize(None)
+        values = time_uniques.to_numpy(dtype='datetime64[ms]')
+        unit = 's' if (values.astype(np.int64) % 1000 == 0).all() else 'ms'
+        times = [time + 'Z' if utc else time
+                 for time in np.datetime_as_string(values, unit=unit).tolist()]
+
+        properties = [{'id': track_id, 'times': time_codes[start:stop].tolist()}
+                      for track_id, start, stop
+                      in zip(ids[starts].tolist(), starts, stops)]
+        styles = None
+        if style_columns is not None:
+            style_codes, styles = TimestampedGeoJson._get_track_styles(
+                df.iloc[starts], style_columns)
+            for prop, code in zip(properties, style_codes):
+                prop['style'] = code
+                if icon == 'circle':
+                    prop['iconstyle'] = code
+        if popup_column is not None:
+            for prop, popup in zip(properties, df[popup_column].iloc[starts].tolist()):
+                prop['popup'] = popup
+        if icon is not None:
+            for prop in properties:
+                prop['icon'] = icon
+
+        coords = df[[lon_column, lat_column]].to_numpy(dtype=float)
+        features = []
+        for prop, start, stop in zip(properties, starts, stops):
+            track = coords[start:stop].tolist()
+            geometry = ({'type': 'LineString', 'coordinates': track}
+                        if len(track) > 1 else
+                        {'type': 'Point', 'coordinates': track[0]})
+            features.append({'type': 'Feature', 'geometry': geometry,
+                             'properties': prop})
+        collection = {'type': 'FeatureCollection', 'features': features}
+        return collection, {'times': times, 'styles': styles}
+
+    @staticmethod
+    def _get_track_styles(first_rows, style_columns):
+        """Return the index of the style of every track and the distinct styles."""
+        if not isinstance(style_columns, dict):
+            style_columns = {column: column for column in style_columns}
+        rows = first_rows[list(style_columns.values())].to_numpy(dtype=object)
+        keys = [json.dumps(row, default=str) for row in rows.tolist()]
+        codes, _ = factorize(keys)
+        _, first = np.unique(codes, return_index=True)
+        styles = [dict(zip(style_columns, rows[i].tolist())) for i in first]
+        return codes.tolist(), styles
+
+    @staticmethod
+    def _dump_features(features):
+        """Serialize features one by one into a FeatureCollection string."""
+        features = ', '.join(json.dumps(feature) for feature in features)
+        return '{"type": "FeatureCollection", "features": [' + features + ']}'
+
     def render(self, **kwargs):
         assert isinstance(self._parent, Map), (
             'TimestampedGeoJson can only be added to a Map object.'
@@ -1,4 +1,5 @@
 import base64
+import codecs
 import io
 import json
 import math
@@ -10,18 +11,44 @@ from contextlib import contextmanager
 import copy
 import uuid
 import collections
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urlparse, uses_netloc, uses_params, uses_relative
 
+from branca.element import Element
+
 import numpy as np
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 try:
     import pandas as pd
 except ImportError:
     pd = None
+try:
+    import ijson
+except ImportError:
+    ijson = None
+try:
+    import shapely
+except ImportError:
+    shapely = None
 
 
 _VALID_URLS = set(uses_relative + uses_netloc + uses_params)
 _VALID_URLS.discard('')
 
+HTTP_TIMEOUT = 30
+HTTP_RETRIES = 3
+
+_http_session = None
+_http_cache = {'cache_dir': None, 'max_age': None}
+_prefetched = {}
+_http_lock = threading.Lock()
+
 
 def validate_location(location):  # noqa: C901
     """Validate a single lat/lon coordinate pair and convert to a list
@@ -75,6 +102,8 @@ def validate_locations(locations):
 
     """
     locations = if_pandas_df_convert_to_numpy(locations)
+    if is_numeric_array(locations) and locations.ndim == 2:
+        return validate_location_array(locations).tolist()
     try:
         iter(locations)
     except TypeError:
@@ -94,6 +123,90 @@ def validate_locations(locations):
         return [validate_locations(lst) for lst in locations]
 
 
+def validate_location_array(locations, n_columns=(2,)):
+    """Validate an array of lat/lon coordinate pairs in one go.
+
+    The vectorized counterpart of `validate_location` for large inputs.
+    Extra columns, such as a weight, are allowed when listed in
+    `n_columns`.
+
+    Returns
+    -------
+    numpy.ndarray of shape (n, n_columns) and dtype float
+
+    """
+    locations = if_pandas_df_convert_to_numpy(locations)
+    try:
+        array = np.asarray(locations, dtype=float)
+    except (TypeError, ValueError):
+        raise ValueError('Locations should consist of numerical values, '
+                         'instead got {!r}.'.format(locations))
+    if array.ndim != 2 or array.shape[1] not in n_columns:
+        raise ValueError('Expected an array of shape (n, {}) for locations, '
+                         'instead got shape {}.'
+                         .format('|'.join(map(str, n_columns)), array.shape))
+    if len(array) == 0:
+        raise ValueError('Locations is empty.')
+    if np.isnan(array[:, :2]).any():
+        raise ValueError('Location values cannot contain NaNs.')
+    return array
+
+
+def is_numeric_array(obj):
+    """Return True for Numpy arrays of booleans or numbers."""
+    return isinstance(obj, np.ndarray) and obj.dtype.kind in 'biuf'
+
+
+def encode_rows(array, dtype='<f8'):
+    """Encode a 2D numeric array as base64 of its float64 values.
+
+    Much faster and smaller than JSON for large arrays. Decode it in the
+    browser with `foliumDecodeRows(data, width)`, see `add_decode_rows_script`.
+    Other little-endian types can be given as `dtype`, for instance '<f4'
+    for float32, then pass the matching typed array constructor, like
+    `foliumDecodeRows(data, width, Float32Array)`.
+
+    """
+    array = np.ascontiguousarray(array, dtype=dtype)
+    return base64.b64encode(array.tobytes()).decode('ascii')
+
+
+_DECODE_ROWS_SCRIPT = """
+    function foliumDecodeArray(data, ArrayType) {
+        var bytes = atob(data);
+        var buffer = new Uint8Array(bytes.length);
+        for (var i = 0; i < bytes.length; i++) {
+            buffer[i] = bytes.charCodeAt(i);
+        }
+        return new (ArrayType || Float64Array)(buffer.buffer);
+    }
+
+    function foliumDecodeRows(data, width, ArrayType) {
+        var values = foliumDecodeArray(data, ArrayType);
+        var rows = new Array(values.length / width);
+        for (var i = 0; i < rows.length; i++) {
+            var row = new Array(width);
+            for (var j = 0; j < width; j++) {
+                row[j] = values[i * width + j];
+            }
+            rows[i] = row;
+        }
+        return rows;
+    }
+"""
+
+
+def add_decode_rows_script(figure):
+    """Add the JS functions decoding `encode_rows` output to a Figure once.
+
+    `foliumDecodeRows(data, width, ArrayType)` returns a list of rows and
+    `foliumDecodeArray(data, ArrayType)` a flat typed array. `ArrayType`
+    is a typed array constructor and defaults to Float64Array.
+    """
+    figure.script.add_child(Element(_DECODE_ROWS_SCRIPT),
+                            name='folium_decode_rows')
+
+
 def if_pandas_df_convert_to_numpy(obj):
     """Return a Numpy array from a Pandas dataframe.
 
@@ -106,6 +219,209 @@ def if_pandas_df_convert_to_numpy(obj):
         return obj
 
 
+def is_geoparquet_path(obj):
+    """Return True if `obj` is the path of a (Geo)Parquet file."""
+    return isinstance(obj, str) and obj.lower().endswith(('.parquet', '.geoparquet'))
+
+
+def if_arrow_convert_to_numpy(obj, columns=None):
+    """Return a Numpy array of points from a pyarrow Table or GeoParquet file.
+
+    Rows are [lat, lon, *columns], with `columns` a list of column names.
+    Other columns of a GeoParquet file are not read. Other objects are
+    returned as is.
+    """
+    if is_geoparquet_path(obj):
+        obj = read_geoparquet(obj, columns=list(columns or []))
+    if is_arrow_table(obj):
+        return arrow_to_points(obj, columns=columns)
+    return obj
+
+
+def factorize(values):
+    """Encode an array-like as integer codes and an array of unique values.
+
+    Missing values (None or NaN) get their own code, with None as unique
+    value. Uses pandas if it is available, otherwise falls back on Numpy.
+
+    Returns
+    -------
+    codes: numpy array of int
+    uniques: numpy array of object
+
+    """
+    if pd is not None:
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+        uniques = np.asarray(uniques, dtype=object)
+    else:
+        positions = {}
+        codes = [-1 if value is None or _is_nan(value)
+                 else positions.setdefault(value, len(positions))
+                 for value in np.asarray(values, dtype=object).tolist()]
+        uniques = np.empty(len(positions), dtype=object)
+        uniques[:] = list(positions)
+    codes = np.asarray(codes, dtype=np.intp)
+    missing = codes < 0
+    if missing.any():
+        codes[missing] = len(uniques)
+        uniques = np.append(uniques, None)
+    return codes, uniques
+
+
+def _is_nan(value):
+    """Return True if `value` is a float NaN."""
+    return isinstance(value, (float, np.floating)) and np.isnan(value)
+
+
+def get_feature_values(features, key_on):
+    """Return the value at `key_on` of each feature, or None where missing.
+
+    `key_on` is in JavaScript object notation, like 'feature.id' or
+    'feature.properties.name'. It's split only once for all features.
+    """
+    if key_on.startswith('feature.'):
+        key_on = key_on[len('feature.'):]
+    keys = key_on.split('.')
+    values = []
+    for value in features:
+        for key in keys:
+            value = value.get(key) if isinstance(value, dict) else None
+        values.append(value)
+    return values
+
+
+def join_keys(keys, index):
+    """Return the position of each key in `index`, or -1 if it's not there.
+
+    If a value occurs more than once in `index`, the last one is used, like
+    when building a dict. Uses pandas if it is available.
+    """
+    if pd is not None:
+        index = pd.Index(index)
+        if index.is_unique:
+            return index.get_indexer(keys)
+        last = ~index.duplicated(keep='last')
+        positions = index[last].get_indexer(keys)
+        return np.where(positions < 0, -1, np.flatnonzero(last)[positions])
+    lookup = {key: i for i, key in enumerate(index)}
+    return np.array([lookup.get(key, -1) for key in keys], dtype=np.intp)
+
+
+BINNING_METHODS = ('quantile', 'equal_count', 'jenks')
+
+
+def get_bin_edges(values, bins=6, max_samples=1000):
+    """Return the bin edges to classify `values` with.
+
+    Parameters
+    ----------
+    values: array-like of float
+        Values without NaN.
+    bins: int, sequence, str or tuple
+        One of 'quantile', 'equal_count' or 'jenks', optionally as a tuple
+        with the number of bins, like ('jenks', 5). The default number of
+        bins is 6. Other values are passed to numpy.histogram.
+        * 'quantile': edges at evenly spaced quantiles of the values.
+        * 'equal_count': edges between data values, chosen so every bin
+          holds about the same number of values. Duplicated values never
+          end up in different bins.
+        * 'jenks': natural breaks, minimizing the sum of squared
+          deviations within the bins (Fisher's exact dynamic programming).
+    max_samples: int, default 1000
+        With 'jenks', if there are more distinct values than this, the
+        edges are computed on this many evenly spaced quantiles of them.
+
+    Returns
+    -------
+    numpy array of float
+        Increasing edges, starting at the minimum and ending at the
+        maximum of the values. A value on an edge is in the bin above,
+        except for the maximum. There can be fewer bins than asked for if
+        there are few distinct values.
+
+    """
+    values = np.asarray(values, dtype=float)
+    if isinstance(bins, str):
+        method, n_bins = bins, 6
+    elif (isinstance(bins, tuple) and len(bins) == 2 and isinstance(bins[0], str)
+            and bins[0] in BINNING_METHODS):
+        method, n_bins = bins
+    else:
+        method = None
+    if method not in BINNING_METHODS:
+        return np.histogram(values, bins=bins)[1]
+    n_bins = int(n_bins)
+    if n_bins < 1:
+        raise ValueError('The number of bins should be at least 1.')
+    sorted_values = np.sort(values)
+    if len(sorted_values) == 0 or sorted_values[0] == sorted_values[-1]:
+        return np.histogram(values, bins=n_bins)[1]
+    if method == 'quantile':
+        edges = np.quantile(sorted_values, np.linspace(0, 1, n_bins + 1))
+    elif method == 'equal_count':
+        positions = np.round(np.linspace(0, len(sorted_values), n_bins + 1)[1:-1])
+        positions = np.clip(positions.astype(int), 1, len(sorted_values) - 1)
+        edges = (sorted_values[positions - 1] + sorted_values[positions]) / 2
+    else:
+        edges = _jenks_breaks(sorted_values, n_bins, max_samples)
+    return np.unique(np.concatenate(
+        [sorted_values[:1], edges, sorted_values[-1:]]))
+
+
+def _jenks_breaks(sorted_values, n_bins, max_samples):
+    """Return the edges between the Jenks natural breaks classes.
+
+    Works on the distinct values weighted by their counts. The cost of
+    every candidate class [start, end) comes from cumulative sums, and each
+    step of the dynamic programming is a single Numpy reduction over a
+    matrix of those costs.
+    """
+    x, weights = np.unique(sorted_values, return_counts=True)
+    if len(x) > max_samples:
+        x = np.quantile(sorted_values, np.linspace(0, 1, max_samples))
+        x, weights = np.unique(x, return_counts=True)
+    n = len(x)
+    n_bins = min(n_bins, n)
+    cum_w = np.concatenate([[0], np.cumsum(weights)])
+    cum_wx = np.concatenate([[0], np.cumsum(weights * x)])
+    cum_wx2 = np.concatenate([[0], np.cumsum(weights * x ** 2)])
+    start = np.arange(n + 1)[:, None]
+    end = np.arange(n + 1)[None, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weight = cum_w[end] - cum_w[start]
+        total = cum_wx[end] - cum_wx[start]
+        cost = cum_wx2[end] - cum_wx2[start] - total ** 2 / weight
+    # Only non-empty classes, with start < end, are allowed.
+    cost[start >= end] = np.inf
+    best = cost[0]  # Lowest cost of the first `end` values in one class.
+    starts = []
+    for _ in range(1, n_bins):
+        candidates = best[:, None] + cost
+        starts.append(np.argmin(candidates, axis=0))
+        best = candidates[starts[-1], np.arange(n + 1)]
+    # Walk back from the end to find where each class starts, and put the
+    # edge halfway from the previous value so that the classes are kept.
+    edges, end = [], n
+    for class_starts in reversed(starts):
+        end = class_starts[end]
+        edges.append((x[end - 1] + x[end]) / 2)
+    return np.array(edges[::-1])
+
+
+def is_array_like(obj):
+    """Return True for lists, tuples, Numpy arrays and pandas Series."""
+    if pd is not None and isinstance(obj, (pd.Series, pd.Index)):
+        return True
+    return isinstance(obj, (list, tuple, np.ndarray))
+
+
+def to_python_type(value):
+    """Return a Python builtin for a Numpy scalar, leave anything else."""
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
 def image_to_url(image, colormap=None, origin='upper'):
     """
     Infers the type of an image argument and transforms it into a URL.
@@ -490,3 +806,1044 @@ def parse_options(**kwargs):
     return {camelize(key): value
             for key, value in kwargs.items()
             if value is not None}
+
+
+def iter_geojson_features(fileobj, use_ijson=None, chunk_size=2 ** 16):
+    """Yield the features of a GeoJSON file one by one.
+
+    Only one feature at a time is kept in memory, so this can be used for
+    files that are too large to load at once. If the GeoJSON is a single
+    Feature or geometry, that is yielded as a Feature.
+
+    Parameters
+    ----------
+    fileobj: file-like object
+        Opened in text or binary mode.
+    use_ijson: bool, default None
+        Whether to parse with the `ijson` package. By default it's used if
+        it's installed and the file is opened in binary mode.
+    chunk_size: int, default 65536
+        Number of characters to read from the file at once.
+
+    """
+    if use_ijson is None:
+        # ijson reads bytes, text files are left to the json module.
+        use_ijson = ijson is not None and not isinstance(fileobj.read(0), str)
+    if use_ijson:
+        if ijson is None:
+            raise ImportError('The ijson package is required with '
+                              '`use_ijson=True`.')
+        members = _iter_features_ijson(fileobj)
+    else:
+        members = _iter_features_python(fileobj, chunk_size)
+    # The parsers end with a list of the other members of the GeoJSON.
+    for feature in members:
+        if isinstance(feature, list):
+            members = dict(feature)
+            break
+        yield feature
+    if 'features' not in members and members.get('type') != 'FeatureCollection':
+        if 'geometry' not in members:
+            members = {'type': 'Feature', 'geometry': members}
+        yield members
+
+
+GEOJSON_SEQ_EXTENSIONS = ('.geojsonl', '.geojsonld', '.geojsons', '.geojsonseq',
+                          '.ndjson', '.jsonl')
+
+
+def is_geojson_seq_path(obj):
+    """Return True if `obj` is the path or URL of a GeoJSONSeq/NDJSON file."""
+    return (isinstance(obj, str)
+            and urlparse(obj).path.lower().endswith(GEOJSON_SEQ_EXTENSIONS))
+
+
+def iter_geojson_seq(lines):
+    """Yield the features of newline-delimited GeoJSON one by one.
+
+    Supports NDJSON and GeoJSONSeq (RFC 8142), where each text starts with
+    a record separator. Only one line is kept in memory at a time.
+
+    Parameters
+    ----------
+    lines: iterable
+        A file opened in text or binary mode, or any iterable of lines.
+        Items that are already dicts are passed through. A line with a
+        FeatureCollection yields its features and a line with a geometry
+        is yielded as a Feature.
+
+    """
+    for line in lines:
+        if isinstance(line, (str, bytes)):
+            line = line.strip().lstrip('\x1e' if isinstance(line, str) else b'\x1e')
+            if not line:
+                continue
+            line = json.loads(line)
+        if line.get('type') == 'FeatureCollection':
+            yield from line['features']
+        elif line.get('type') == 'Feature' or 'geometry' in line:
+            yield line
+        else:
+            yield {'type': 'Feature', 'geometry': line}
+
+
+def write_geojson_seq(features, fileobj):
+    """Write features to a text file as newline-delimited GeoJSON."""
+    for feature in features:
+        fileobj.write(json.dumps(feature, separators=(',', ':')))
+        fileobj.write('\n')
+
+
+def _iter_features_ijson(fileobj):
+    """Yield features with ijson, end with the list of other members."""
+    feature = None
+    members = ijson.ObjectBuilder()
+    for prefix, event, value in ijson.parse(fileobj, use_float=True):
+        if prefix == 'features.item' and event == 'start_map':
+            feature = ijson.ObjectBuilder()
+        if feature is not None:
+            feature.event(event, value)
+            if prefix == 'features.item' and event == 'end_map':
+                yield feature.value
+                feature = None
+        elif not (prefix == 'features' or prefix.startswith('features.')
+                  or (prefix == '' and value == 'features')):
+            members.event(event, value)
+    yield list(getattr(members, 'value', {}).items())
+
+
+def _iter_features_python(fileobj, chunk_size):
+    """Yield features with the json module, end with the other members."""
+    reader = _JsonStreamReader(fileobj, chunk_size)
+    reader.expect('{')
+    members = []
+    while not reader.consume('}'):
+        reader.consume(',')
+        key = reader.decode()
+        reader.expect(':')
+        if key == 'features':
+            reader.expect('[')
+            while not reader.consume(']'):
+                reader.consume(',')
+                yield reader.decode()
+            members.append(('features', None))
+        else:
+            members.append((key, reader.decode()))
+    yield members
+
+
+class _JsonStreamReader(object):
+    """Decode JSON values one at a time from a file, reading as needed."""
+
+    def __init__(self, fileobj, chunk_size):
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.eof = False
+
+    def read(self):
+        """Add a chunk from the file to the buffer, return False at EOF."""
+        chunk = self.fileobj.read(self.chunk_size)
+        if isinstance(chunk, bytes):
+            chunk = self.text_decoder.decode(chunk, final=not chunk)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer += chunk
+        return True
+
+    def skip_whitespace(self):
+        while True:
+            self.buffer = self.buffer.lstrip()
+            if self.buffer or not self.read():
+                return
+
+    def consume(self, char):
+        """Remove `char` if it's the next non-whitespace character."""
+        self.skip_whitespace()
+        if self.buffer.startswith(char):
+            self.buffer = self.buffer[1:]
+            return True
+        return False
+
+    def expect(self, char):
+        if not self.consume(char):
+            raise ValueError('Invalid GeoJSON, expected {!r} but got {!r}.'
+                             .format(char, self.buffer[:20]))
+
+    def decode(self):
+        """Decode the next JSON value, reading until it's complete."""
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer)
+            except json.JSONDecodeError:
+                if not self.read():
+                    raise
+                continue
+            # A number could continue in the next chunk.
+            if end == len(self.buffer) and not self.eof and self.read():
+                continue
+            self.buffer = self.buffer[end:]
+            return value
+
+
+def simplify_coords(coords, tolerance):
+    """Simplify a line with the Douglas-Peucker algorithm.
+
+    Closed rings keep at least four points and lines at least two.
+
+    Parameters
+    ----------
+    coords: list of coordinate pairs
+    tolerance: float
+        Maximum distance between the original and the simplified line, in
+        the units of the coordinates.
+
+    Returns
+    -------
+    list of coordinate pairs
+
+    """
+    points = np.asarray(coords, dtype=float)
+    if len(points) < 3:
+        return coords
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = points[end, :2] - points[start, :2]
+        offsets = points[start + 1:end, :2] - points[start, :2]
+        norm = np.hypot(*segment)
+        if norm == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1]
+                               - segment[1] * offsets[:, 0]) / norm
+        i = int(np.argmax(distances))
+        if distances[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.extend([(start, split), (split, end)])
+    is_ring = np.array_equal(points[0], points[-1])
+    if is_ring and keep.sum() < 4:
+        return coords
+    return [coords[i] for i in np.flatnonzero(keep)]
+
+
+def simplify_geometry(geometry, tolerance):
+    """Return a copy of a GeoJSON geometry simplified with `simplify_coords`."""
+    if not geometry:
+        return geometry
+    geom_type = geometry.get('type')
+    if geom_type == 'GeometryCollection':
+        geometries = [simplify_geometry(geom, tolerance)
+                      for geom in geometry['geometries']]
+        return dict(geometry, geometries=geometries)
+    depth = {'LineString': 0, 'MultiLineString': 1, 'Polygon': 1,
+             'MultiPolygon': 2}.get(geom_type)
+    if depth is None:
+        return geometry
+
+    def simplify(coords, level):
+        if level == 0:
+            return simplify_coords(coords, tolerance)
+        return [simplify(part, level - 1) for part in coords]
+
+    return dict(geometry, coordinates=simplify(geometry['coordinates'], depth))
+
+
+def get_geometry_bounds(geometry):
+    """Return [[lat_min, lon_min], [lat_max, lon_max]] of a GeoJSON geometry.
+
+    Returns None for an empty geometry.
+    """
+    if not geometry:
+        return None
+    if geometry.get('type') == 'GeometryCollection':
+        bounds = [get_geometry_bounds(geom) for geom in geometry['geometries']]
+        return merge_bounds(*bounds)
+    coords = list(iter_coords(geometry['coordinates']))
+    if not coords:
+        return None
+    points = np.array([point[:2] for point in coords], dtype=float)
+    lon_min, lat_min = points.min(axis=0)
+    lon_max, lat_max = points.max(axis=0)
+    return [[float(lat_min), float(lon_min)], [float(lat_max), float(lon_max)]]
+
+
+def merge_bounds(*bounds):
+    """Return the bounds enclosing all of the given bounds, ignoring None."""
+    out = [[None, None], [None, None]]
+    for bound in bounds:
+        if bound is None:
+            continue
+        out = [
+            [none_min(out[0][0], bound[0][0]), none_min(out[0][1], bound[0][1])],
+            [none_max(out[1][0], bound[1][0]), none_max(out[1][1], bound[1][1])],
+        ]
+    return out
+
+
+def get_topojson_bounds(topology):
+    """Return [[lat_min, lon_min], [lat_max, lon_max]] of a TopoJSON's arcs.
+
+    All arcs are put in one flat Numpy buffer. Quantized, delta-encoded
+    arcs are decoded with a single cumulative sum that restarts at each
+    arc, and the bounds are a single reduction over the positions.
+    """
+    arcs = topology.get('arcs') or []
+    lengths = np.array([len(arc) for arc in arcs], dtype=np.intp)
+    if not lengths.sum():
+        return [[None, None], [None, None]]
+    positions = np.array([position[:2] for arc in arcs for position in arc],
+                         dtype=float)
+    transform = topology.get('transform')
+    if transform is not None:
+        positions = np.cumsum(positions, axis=0)
+        # Subtract the running total from before the start of each arc.
+        starts = np.cumsum(lengths) - lengths
+        offsets = np.vstack([[0, 0], positions])[starts[lengths > 0]]
+        positions -= np.repeat(offsets, lengths[lengths > 0], axis=0)
+        positions = (positions * transform['scale']) + transform['translate']
+    lon_min, lat_min = positions.min(axis=0)
+    lon_max, lat_max = positions.max(axis=0)
+    return [[float(lat_min), float(lon_min)], [float(lat_max), float(lon_max)]]
+
+
+class SpatialIndex(object):
+    """A static R-tree over bounding boxes, packed with Sort-Tile-Recursive.
+
+    The tree is stored in Numpy arrays, one array of node boxes per level,
+    and queried level by level with vectorized intersection tests. Nodes
+    are packed in order, so the children of node `i` are the nodes
+    `i * node_capacity` up to `(i + 1) * node_capacity` of the level below.
+
+    Parameters
+    ----------
+    bounds: list of bounds
+        One [[lat_min, lon_min], [lat_max, lon_max]] per item. Items with
+        bounds None are never returned by queries.
+    node_capacity: int, default 16
+        Maximum number of children per node.
+
+    Examples
+    --------
+    >>> index = SpatialIndex([get_geometry_bounds(f['geometry']) for f in features])
+    >>> index.query([[40, -10], [50, 10]])  # Positions of the intersecting items
+    >>> index.query_point([45, 2])
+
+    """
+
+    def __init__(self, bounds, node_capacity=16):
+        if node_capacity < 2:
+            raise ValueError('node_capacity should be at least 2.')
+        self.node_capacity = node_capacity
+        boxes = np.full((len(bounds), 4), np.nan)
+        for i, bound in enumerate(bounds):
+            if bound is not None and None not in bound[0] + bound[1]:
+                boxes[i] = bound[0] + bound[1]
+        valid = np.flatnonzero(~np.isnan(boxes).any(axis=1))
+        self.order = valid[self._pack(boxes[valid])]
+        self.levels = [boxes[self.order]]
+        while len(self.levels[-1]) > 1:
+            self.levels.append(self._parent_boxes(self.levels[-1]))
+
+    def __len__(self):
+        return len(self.order)
+
+    def _pack(self, boxes):
+        """Return the order of the boxes in the leaves of the tree."""
+        n_leaves = -(-len(boxes) // self.node_capacity)
+        n_slices = max(int(math.ceil(math.sqrt(n_leaves))), 1)
+        slice_size = n_slices * self.node_capacity
+        centers = (boxes[:, :2] + boxes[:, 2:]) / 2
+        order = np.argsort(centers[:, 1], kind='stable')
+        # Within each vertical slice, sort by latitude.
+        slices = np.arange(len(boxes)) // slice_size
+        return order[np.lexsort((centers[order, 0], slices))]
+
+    def _parent_boxes(self, boxes):
+        """Return the boxes enclosing each group of node_capacity boxes."""
+        starts = np.arange(0, len(boxes), self.node_capacity)
+        return np.column_stack([
+            np.minimum.reduceat(boxes[:, 0], starts),
+            np.minimum.reduceat(boxes[:, 1], starts),
+            np.maximum.reduceat(boxes[:, 2], starts),
+            np.maximum.reduceat(boxes[:, 3], starts),
+        ])
+
+    def query(self, bounds):
+        """Return the sorted positions of the items intersecting `bounds`.
+
+        Parameters
+        ----------
+        bounds: [[lat_min, lon_min], [lat_max, lon_max]]
+
+        """
+        if not len(self.order):
+            return np.zeros(0, dtype=np.intp)
+        (lat_min, lon_min), (lat_max, lon_max) = bounds
+        nodes = np.arange(len(self.levels[-1]))
+        for depth, boxes in enumerate(reversed(self.levels)):
+            if depth:
+                nodes = (nodes[:, None] * self.node_capacity
+                         + np.arange(self.node_capacity)).ravel()
+                nodes = nodes[nodes < len(boxes)]
+            box = boxes[nodes]
+            nodes = nodes[(box[:, 0] <= lat_max) & (box[:, 2] >= lat_min)
+                          & (box[:, 1] <= lon_max) & (box[:, 3] >= lon_min)]
+        return np.sort(self.order[nodes])
+
+    def query_point(self, location):
+        """Return the sorted positions of the items whose bounds contain a point.
+
+        Parameters
+        ----------
+        location: [lat, lon]
+
+        """
+        lat, lon = location
+        return self.query([[lat, lon], [lat, lon]])
+
+
+def project_web_mercator(locations):
+    """Project lat/lon pairs to Web Mercator coordinates between 0 and 1.
+
+    x grows eastwards and y southwards, as with map tiles, so at zoom
+    level `z` the world is `256 * 2 ** z` pixels wide.
+
+    Returns
+    -------
+    numpy.ndarray of shape (n, 2) with columns x, y
+
+    """
+    locations = np.asarray(locations, dtype=float)
+    sin = np.clip(np.sin(np.radians(locations[:, 0])), -0.9999, 0.9999)
+    x = locations[:, 1] / 360 + 0.5
+    y = 0.5 - np.log((1 + sin) / (1 - sin)) / (4 * math.pi)
+    return np.clip(np.column_stack([x, y]), 0, 1 - 1e-12)
+
+
+def _interleave_bits(values):
+    """Spread the lower 32 bits of unsigned integers over the even bits."""
+    values = values & np.uint64(0xFFFFFFFF)
+    for shift, mask in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF),
+                        (4, 0x0F0F0F0F0F0F0F0F), (2, 0x3333333333333333),
+                        (1, 0x5555555555555555)):
+        values = (values | (values << np.uint64(shift))) & np.uint64(mask)
+    return values
+
+
+def _iter_grid_levels(locations, values, min_zoom, max_zoom, cell_size):
+    """Sum values over Web Mercator grid cells, from max_zoom up to min_zoom.
+
+    At zoom level `z` the cells are `cell_size` pixels wide, and split in
+    four at the next zoom level. Sorted along a Z-order curve the cells of
+    a zoom level are contiguous runs of the cells of the next zoom level,
+    so each level is aggregated from the cells of the level below.
+
+    Yields
+    ------
+    zoom, and for every non-empty cell its count of points, its row of
+    summed values and the position of one of its points in `locations`.
+
+    """
+    locations = np.asarray(locations, dtype=float).reshape(-1, 2)
+    scale = 256 * 2 ** max_zoom / cell_size
+    if scale >= 2 ** 32:
+        raise ValueError('max_zoom {} is too deep for cells of {} pixels.'
+                         .format(max_zoom, cell_size))
+    cells = np.floor(project_web_mercator(locations) * scale).astype(np.uint64)
+    keys = _interleave_bits(cells[:, 0]) << np.uint64(1) | _interleave_bits(cells[:, 1])
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    positions = order
+    counts = np.ones(len(keys), dtype=np.int64)
+    sums = np.asarray(values, dtype=float)[order]
+    for zoom in range(max_zoom, min_zoom - 1, -1):
+        changes = np.concatenate([[True], keys[1:] != keys[:-1]])
+        runs = np.flatnonzero(changes)
+        if len(runs) < len(keys):
+            keys, positions = keys[runs], positions[runs]
+            counts = np.add.reduceat(counts, runs)
+            sums = np.add.reduceat(sums, runs, axis=0)
+        yield zoom, counts, sums, positions
+        keys = keys >> np.uint64(2)
+
+
+def cluster_points(locations, min_zoom=0, max_zoom=17, radius=80):
+    """Cluster points on a Web Mercator grid for every zoom level.
+
+    At zoom level `z` points are grouped by grid cells of `radius` pixels.
+    The cells of a zoom level are split in four at the next one, so the
+    clusters form a hierarchy and a point that is alone in its cell stays
+    alone when zooming in.
+
+    Parameters
+    ----------
+    locations: array of shape (n, 2)
+        Latitude and longitude of the points.
+    min_zoom, max_zoom: int, default 0 and 17
+        Zoom levels to compute clusters for.
+    radius: int, default 80
+        Cluster size in pixels.
+
+    Returns
+    -------
+    clusters: dict
+        For every zoom level with clusters, an array with one row
+        [lat, lon, count] per cell holding more than one point. The
+        location is the mean location of the points in the cell.
+    leaf_zoom: numpy.ndarray of int
+        For every point, the first zoom level where it is drawn on its own,
+        `max_zoom + 1` for points that are clustered at every level.
+
+    """
+    locations = np.asarray(locations, dtype=float).reshape(-1, 2)
+    leaf_zoom = np.full(len(locations), max_zoom + 1, dtype=np.int64)
+    clusters = {}
+    levels = _iter_grid_levels(locations, locations, min_zoom, max_zoom, radius)
+    for zoom, counts, sums, positions in levels:
+        alone = counts == 1
+        leaf_zoom[positions[alone]] = zoom
+        if not alone.all():
+            clusters[zoom] = np.column_stack([sums[~alone] / counts[~alone, None],
+                                              counts[~alone]])
+    return dict(sorted(clusters.items())), leaf_zoom
+
+
+def aggregate_points(data, min_zoom=0, max_zoom=18, cell_size=20,
+                     max_points=None):
+    """Aggregate weighted points on a Web Mercator grid for every zoom level.
+
+    At zoom level `z` the points are summed over grid cells of `cell_size`
+    pixels, with the cells split in four at the next zoom level.
+
+    Parameters
+    ----------
+    data: array of shape (n, 2) or (n, 3)
+        Latitude, longitude and optionally the weight of the points.
+    min_zoom, max_zoom: int, default 0 and 18
+        Zoom levels to aggregate the points for.
+    cell_size: int, default 20
+        Cell size in pixels.
+    max_points: int, default None
+        Keep at most this many cells per zoom level, those with the
+        largest weights. Every zoom level is kept.
+
+    Returns
+    -------
+    dict
+        For every zoom level, an array with one row [lat, lon, weight] per
+        non-empty cell. The location is the mean location of the points in
+        the cell and the weight the sum of their weights.
+
+    """
+    data = np.asarray(data, dtype=float)
+    data = data.reshape(-1, data.shape[-1] if data.size else 2)
+    weights = data[:, 2] if data.shape[1] > 2 else np.ones(len(data))
+    values = np.column_stack([data[:, :2], weights])
+    levels = {}
+    for zoom, counts, sums, _ in _iter_grid_levels(
+            data[:, :2], values, min_zoom, max_zoom, cell_size):
+        rows = np.column_stack([sums[:, :2] / counts[:, None], sums[:, 2]])
+        if max_points is not None and len(rows) > max_points:
+            heaviest = np.argpartition(-rows[:, 2], max_points)[:max_points]
+            rows = rows[np.sort(heaviest)]
+        levels[zoom] = rows
+    return dict(sorted(levels.items()))
+
+
+def kernel_density(data, bounds=None, width=1024, radius=10):
+    """Compute a Gaussian kernel density estimate on a Web Mercator grid.
+
+    The weighted points are counted per pixel, then blurred with a
+    Gaussian kernel by multiplying with its transfer function in the
+    Fourier domain. The cost grows with the number of pixels, not with the
+    number of points past the counting step.
+
+    Parameters
+    ----------
+    data: array of shape (n, 2) or (n, 3)
+        Latitude, longitude and optionally the weight of the points.
+    bounds: list, default None
+        Area to compute, in the form [[lat_min, lon_min], [lat_max, lon_max]].
+        Defaults to the bounds of the points with a margin of three times
+        the radius, the widest side spanning `width` pixels.
+    width: int, default 1024
+        Width of the grid in pixels. The height follows from the bounds.
+    radius: float, default 10
+        Standard deviation of the kernel in pixels.
+
+    Returns
+    -------
+    density: numpy.ndarray of shape (height, width)
+        The density per pixel, with the northern row first.
+    bounds: list
+        The bounds of the grid, in the form [[lat_min, lon_min], [lat_max, lon_max]].
+
+    """
+    data = np.asarray(data, dtype=float)
+    weights = data[:, 2] if data.shape[1] > 2 else None
+    xy = project_web_mercator(data[:, :2])
+    pad = int(math.ceil(3 * radius))
+    if bounds is None:
+        (x0, y0), (x1, y1) = xy.min(axis=0), xy.max(axis=0)
+        pixel = max(x1 - x0, y1 - y0, 1e-9) / max(width - 2 * pad, 1)
+        x0 = (x0 + x1 - width * pixel) / 2
+        y0, y1 = y0 - pad * pixel, y1 + pad * pixel
+    else:
+        (lat_min, lon_min), (lat_max, lon_max) = bounds
+        (x0, y0), (x1, y1) = project_web_mercator([[lat_max, lon_min],
+                                                   [lat_min, lon_max]])
+        pixel = (x1 - x0) / width
+    height = max(int(round((y1 - y0) / pixel)), 1)
+
+    # Count the points per pixel of the grid and the margin around it.
+    shape = (height + 2 * pad, width + 2 * pad)
+    cells = np.floor((xy - [x0, y0]) / pixel).astype(np.int64) + pad
+    inside = ((cells >= 0) & (cells < [shape[1], shape[0]])).all(axis=1)
+    counts = np.bincount(cells[inside, 1] * shape[1] + cells[inside, 0],
+                         weights=None if weights is None else weights[inside],
+                         minlength=shape[0] * shape[1]).reshape(shape)
+
+    fy = np.fft.fftfreq(shape[0])[:, None]
+    fx = np.fft.rfftfreq(shape[1])[None, :]
+    transfer = np.exp(-2 * math.pi ** 2 * radius ** 2 * (fx ** 2 + fy ** 2))
+    density = np.fft.irfft2(np.fft.rfft2(counts) * transfer, s=shape)
+    density = np.clip(density[pad:pad + height, pad:pad + width], 0, None)
+
+    lat_max, lat_min = np.degrees(np.arctan(np.sinh(
+        math.pi * (1 - 2 * np.array([y0, y0 + height * pixel]))))).tolist()
+    lon_min, lon_max = ((np.array([x0, x0 + width * pixel]) - 0.5) * 360).tolist()
+    return density, [[lat_min, lon_min], [lat_max, lon_max]]
+
+
+def get_http_session():
+    """Return the requests Session shared by folium, with retries."""
+    global _http_session
+    with _http_lock:
+        if _http_session is None:
+            retry = Retry(total=HTTP_RETRIES, backoff_factor=0.3,
+                          status_forcelist=(429, 500, 502, 503, 504))
+            adapter = HTTPAdapter(max_retries=retry, pool_maxsize=16)
+            _http_session = requests.Session()
+            _http_session.mount('http://', adapter)
+            _http_session.mount('https://', adapter)
+    return _http_session
+
+
+def set_http_cache(cache_dir=None, max_age=None):
+    """Cache downloaded files on disk, or disable the cache.
+
+    Cached files are revalidated with the server using their ETag or
+    Last-Modified headers, so they are only downloaded again when they
+    changed.
+
+    Parameters
+    ----------
+    cache_dir: str, default None
+        Directory to store the files in. Use None to disable the cache.
+    max_age: float, default None
+        Number of seconds a cached file is used without checking with the
+        server if it changed.
+
+    """
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+    _http_cache.update(cache_dir=cache_dir, max_age=max_age)
+
+
+def get_url(url, stream=False):
+    """Return a binary file object with the content of `url`.
+
+    Uses the shared session and the cache configured with `set_http_cache`.
+    If `stream` is True and there is no cache, the content is read from
+    the connection while it comes in.
+    """
+    with _http_lock:
+        content = _prefetched.pop(url, None)
+    if content is not None:
+        return io.BytesIO(content)
+    if _http_cache['cache_dir'] is not None:
+        return open(_fetch_to_cache(url), 'rb')
+    response = get_http_session().get(url, stream=stream, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    if stream:
+        response.raw.decode_content = True
+        return response.raw
+    return io.BytesIO(response.content)
+
+
+def _fetch_to_cache(url):
+    """Download `url` into the cache if needed, return the file path."""
+    key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    path = os.path.join(_http_cache['cache_dir'], key)
+    meta_path = path + '.json'
+    meta = {}
+    if os.path.isfile(path) and os.path.isfile(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        max_age = _http_cache['max_age']
+        if max_age is not None and time.time() - meta['fetched'] < max_age:
+            return path
+    headers = {}
+    # Only revalidate with what the server stated, without any the file is
+    # downloaded again.
+    if meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
+    response = get_http_session().get(url, headers=headers, stream=True,
+                                      timeout=HTTP_TIMEOUT)
+    if response.status_code != 304:
+        response.raise_for_status()
+        _atomic_write(path, response.iter_content(2 ** 16))
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+    response.close()
+    meta['fetched'] = time.time()
+    _atomic_write(meta_path, [json.dumps(meta).encode('utf-8')])
+    return path
+
+
+def _atomic_write(path, chunks):
+    """Write chunks of bytes to a temporary file, then move it to `path`."""
+    fid, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fid, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+class _PrefetchedUrls(object):
+    """Context manager discarding the prefetched content of some URLs on exit."""
+
+    def __init__(self, urls):
+        self.urls = urls
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.discard()
+
+    def discard(self):
+        """Forget the content of the URLs that wasn't used."""
+        with _http_lock:
+            for url in self.urls:
+                _prefetched.pop(url, None)
+
+
+def prefetch_urls(urls, max_workers=8):
+    """Download multiple URLs concurrently, for layers created after this.
+
+    With a cache set by `set_http_cache` the files are stored there,
+    otherwise they are kept in memory until they are first used. Use the
+    return value as a context manager to scope the downloads to the layers
+    created within it, content that wasn't used is discarded on exit.
+
+    Examples
+    --------
+    >>> with prefetch_urls([states_url, counties_url]):
+    ...     GeoJson(states_url).add_to(m)
+    ...     GeoJson(counties_url).add_to(m)
+
+    """
+    urls = list(urls)
+
+    def fetch(url):
+        if _http_cache['cache_dir'] is not None:
+            _fetch_to_cache(url)
+        else:
+            with get_url(url) as f:
+                content = f.read()
+            with _http_lock:
+                _prefetched[url] = content
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Consume the results to raise any exceptions.
+        list(executor.map(fetch, urls))
+    return _PrefetchedUrls(urls)
+
+
+_SHAPELY_GEOMETRY_TYPES = {
+    0: 'Point',
+    1: 'LineString',
+    3: 'Polygon',
+    4: 'MultiPoint',
+    5: 'MultiLineString',
+    6: 'MultiPolygon',
+}
+
+
+def shapely_to_geojson_geometries(geometries):
+    """Convert an array of shapely geometries to GeoJSON geometry dicts.
+
+    The coordinates of all geometries of a type are taken at once as a
+    flat Numpy buffer with offsets, and only converted to nested lists at
+    the end. Missing and empty geometries become None. Requires shapely 2.
+
+    """
+    geometries = np.asarray(geometries, dtype=object)
+    out = [None] * len(geometries)
+    type_ids = shapely.get_type_id(geometries)
+    type_ids[shapely.is_empty(geometries)] = -1
+    for type_id in np.unique(type_ids):
+        indices = np.flatnonzero(type_ids == type_id)
+        geom_type = _SHAPELY_GEOMETRY_TYPES.get(int(type_id))
+        if type_id < 0:
+            continue
+        elif geom_type is None:
+            # GeometryCollection and LinearRing
+            for i in indices:
+                out[i] = json.loads(shapely.to_geojson(geometries[i]))
+            continue
+        _, coords, offsets = shapely.to_ragged_array(geometries[indices])
+        parts = nest_coordinates(coords, offsets)
+        for i, coordinates in zip(indices, parts):
+            out[i] = {'type': geom_type, 'coordinates': coordinates}
+    return out
+
+
+def nest_coordinates(coords, offsets):
+    """Convert a flat coordinate buffer with offsets to nested lists.
+
+    Parameters
+    ----------
+    coords: numpy array of shape (n, 2)
+    offsets: list of numpy arrays of int
+        The innermost offsets first, like those of shapely.to_ragged_array.
+
+    """
+    parts = coords.tolist()
+    for part_offsets in offsets:
+        bounds = np.asarray(part_offsets).tolist()
+        parts = [parts[start:end]
+                 for start, end in zip(bounds[:-1], bounds[1:])]
+    return parts
+
+
+def geopandas_to_geojson(data):
+    """Convert a GeoDataFrame or GeoSeries to a GeoJSON FeatureCollection.
+
+    Avoids the round trip through `__geo_interface__` and `json`, see
+    `shapely_to_geojson_geometries`. Missing property values become None.
+    Falls back on `__geo_interface__` if shapely 2 is not available.
+    """
+    if not hasattr(shapely, 'to_ragged_array'):
+        return json.loads(json.dumps(data.__geo_interface__))
+    properties = [{} for _ in range(len(data))]
+    if hasattr(data, 'columns'):
+        geometries = data.geometry.values
+        columns = data.drop(columns=data.geometry.name)
+        if len(columns.columns):
+            properties = (columns.astype(object)
+                          .where(columns.notna(), None)
+                          .to_dict('records'))
+    else:
+        geometries = data.values
+    geojson_geometries = shapely_to_geojson_geometries(geometries)
+    if not len(properties) == len(geojson_geometries) == len(data):
+        raise ValueError('Got {} properties and {} geometries for {} rows.'.format(
+            len(properties), len(geojson_geometries), len(data)))
+    features = [
+        {'id': str(index), 'type': 'Feature', 'properties': props,
+         'geometry': geometry}
+        for index, props, geometry in zip(data.index, properties, geojson_geometries)
+    ]
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def is_epsg_4326(crs):
+    """Return True if a GeoPandas crs is EPSG:4326 (WGS84 lat/lon)."""
+    try:
+        return crs is not None and crs.to_epsg() == 4326
+    except AttributeError:
+        return False
+
+
+_GEOARROW_GEOMETRY_TYPES = {
+    'point': 'Point',
+    'linestring': 'LineString',
+    'polygon': 'Polygon',
+    'multipoint': 'MultiPoint',
+    'multilinestring': 'MultiLineString',
+    'multipolygon': 'MultiPolygon',
+}
+
+
+def is_arrow_table(obj):
+    """Return True if `obj` is a pyarrow Table."""
+    return (type(obj).__module__.split('.')[0] == 'pyarrow'
+            and hasattr(obj, 'schema') and hasattr(obj, 'column'))
+
+
+def read_geoparquet(path, columns=None):
+    """Read a GeoParquet file into a pyarrow Table.
+
+    Parameters
+    ----------
+    path: str
+    columns: list of str, default None
+        The columns to read besides the geometry. Other columns are not
+        loaded at all. If None, all columns are read.
+
+    """
+    import pyarrow.parquet as pq
+
+    if columns is not None:
+        geometry_column, _ = get_arrow_geometry_column(pq.read_schema(path))
+        columns = [geometry_column] + [col for col in columns
+                                       if col != geometry_column]
+    return pq.read_table(path, columns=columns)
+
+
+def get_arrow_geometry_column(schema, geometry_column=None):
+    """Return the name and encoding of the geometry column of a schema.
+
+    The encoding is 'wkb' or a GeoArrow geometry type like 'point'. It's
+    taken from the GeoParquet metadata or the GeoArrow extension type. If
+    the extension type isn't registered with pyarrow, as without the
+    geoarrow-pyarrow package, it's read from the field metadata. A CRS in
+    the extension metadata has to be longitude/latitude.
+    """
+    metadata = schema.metadata or {}
+    geo = json.loads(metadata[b'geo']) if b'geo' in metadata else {}
+    name = geometry_column or geo.get('primary_column', 'geometry')
+    encoding = geo.get('columns', {}).get(name, {}).get('encoding')
+    if encoding is None:
+        field = schema.field(name)
+        field_metadata = field.metadata or {}
+        extension_name = (getattr(field.type, 'extension_name', None)
+                          or field_metadata.get(b'ARROW:extension:name', b'').decode())
+        extension_metadata = field_metadata.get(b'ARROW:extension:metadata')
+        crs = json.loads(extension_metadata).get('crs') if extension_metadata else None
+        if crs is not None and not _is_lonlat_crs(crs):
+            raise ValueError('The geometry column {!r} should be in longitude '
+                             'and latitude (EPSG:4326), reproject it first.'
+                             .format(name))
+        encoding = extension_name.replace('geoarrow.', '') or 'wkb'
+    return name, encoding.lower()
+
+
+def _is_lonlat_crs(crs):
+    """Return True if a GeoArrow CRS, a string or PROJJSON, is EPSG:4326 or CRS84."""
+    if isinstance(crs, dict):
+        crs_id = crs.get('id') or {}
+        crs = '{}:{}'.format(crs_id.get('authority'), crs_id.get('code'))
+    return str(crs).upper() in ('EPSG:4326', 'OGC:CRS84', 'WGS84')
+
+
+def arrow_geometry_to_coordinates(column, encoding):
+    """Get the coordinates of a GeoArrow-native geometry column.
+
+    Returns
+    -------
+    coords: numpy array of shape (n, 2) with longitude and latitude.
+    offsets: list of numpy arrays of int, innermost first.
+    valid: numpy array of bool, False for missing geometries.
+
+    """
+    import pyarrow as pa
+
+    arr = column.combine_chunks() if hasattr(column, 'combine_chunks') else column
+    if isinstance(arr.type, pa.ExtensionType):
+        arr = arr.storage
+    valid = ~np.asarray(arr.is_null().to_numpy(zero_copy_only=False))
+    offsets = []
+    while pa.types.is_list(arr.type) or pa.types.is_large_list(arr.type):
+        offsets.append(arr.offsets.to_numpy())
+        arr = arr.values
+    if pa.types.is_struct(arr.type):
+        x, y = arr.flatten()[:2]
+        coords = np.column_stack([x.to_numpy(zero_copy_only=False),
+                                  y.to_numpy(zero_copy_only=False)])
+    elif pa.types.is_fixed_size_list(arr.type):
+        size = arr.type.list_size
+        coords = arr.flatten().to_numpy().reshape(-1, size)[:, :2]
+    else:
+        raise ValueError('Unsupported GeoArrow encoding {!r} with type {}.'
+                         .format(encoding, arr.type))
+    return coords.astype(float), offsets[::-1], valid
+
+
+def arrow_to_geojson(table, geometry_column=None):
+    """Convert a pyarrow Table with geometries to a FeatureCollection.
+
+    The geometry column can be WKB or GeoArrow-native. The other columns
+    become the properties. The coordinates stay in Numpy buffers until
+    they are converted to nested lists, and the bounds are computed from
+    them.
+
+    Returns
+    -------
+    dict
+        The FeatureCollection.
+    bounds
+        [[lat_min, lon_min], [lat_max, lon_max]]
+
+    """
+    name, encoding = get_arrow_geometry_column(table.schema, geometry_column)
+    column = table.column(name)
+    if encoding == 'wkb':
+        geometries = shapely.from_wkb(column.to_numpy(zero_copy_only=False))
+        geojson_geometries = shapely_to_geojson_geometries(geometries)
+        lon_min, lat_min, lon_max, lat_max = shapely.total_bounds(geometries)
+    else:
+        geom_type = _GEOARROW_GEOMETRY_TYPES[encoding]
+        coords, offsets, valid = arrow_geometry_to_coordinates(column, encoding)
+        geojson_geometries = [
+            {'type': geom_type, 'coordinates': coordinates} if is_valid else None
+            for coordinates, is_valid in zip(nest_coordinates(coords, offsets), valid)
+        ]
+        if encoding == 'point':
+            coords = coords[valid]
+        lon_min, lat_min = np.nanmin(coords, axis=0)
+        lon_max, lat_max = np.nanmax(coords, axis=0)
+    properties = table.drop([name]).to_pylist()
+    features = [
+        {'id': str(i), 'type': 'Feature', 'properties': props, 'geometry': geometry}
+        for i, (props, geometry) in enumerate(zip(properties, geojson_geometries))
+    ]
+    bounds = [[float(lat_min), float(lon_min)], [float(lat_max), float(lon_max)]]
+    return {'type': 'FeatureCollection', 'features': features}, bounds
+
+
+def arrow_to_points(table, geometry_column=None, columns=None):
+    """Convert a pyarrow Table with point geometries to an array of points.
+
+    Returns a Numpy array with a row per point: latitude, longitude and
+    then the values of `columns`, a list of column names, in order.
+    """
+    name, encoding = get_arrow_geometry_column(table.schema, geometry_column)
+    column = table.column(name)
+    if encoding == 'wkb':
+        geometries = shapely.from_wkb(column.to_numpy(zero_copy_only=False))
+        if not np.all(shapely.get_type_id(geometries) == 0):
+            raise ValueError('All geometries should be points.')
+        lonlat = shapely.get_coordinates(geometries)
+    elif encoding == 'point':
+        lonlat, _, _ = arrow_geometry_to_coordinates(column, encoding)
+    else:
+        raise ValueError('All geometries should be points, got {!r}.'
+                         .format(encoding))
+    values = [lonlat[:, 1], lonlat[:, 0]]
+    values += [table.column(col).to_numpy(zero_copy_only=False)
+               for col in columns or []]
+    if not all(np.issubdtype(col.dtype, np.number) for col in values):
+        values = [col.astype(object) for col in values]
+    return np.column_stack(values)
@@ -7,7 +7,7 @@ Test FastMarkerCluster
 
 import folium
 from folium.plugins import FastMarkerCluster
-from folium.utilities import normalize
+from folium.utilities import encode_rows, normalize
 
 from jinja2 import Template
 
@@ -40,7 +40,7 @@ def test_fast_marker_cluster():
         var {{ this.get_name() }} = (function(){
             {{ this.callback }}
 
-            var data = {{ this.data|tojson }};
+            var data = foliumDecodeRows({{ encoded|tojson }}, 2);
             var cluster = L.markerClusterGroup({{ this.options|tojson }});
             {%- if this.icon_create_function is not none %}
             cluster.options.iconCreateFunction =
@@ -57,8 +57,9 @@ def test_fast_marker_cluster():
             return cluster;
         })();
     """)
-    expected = normalize(tmpl.render(this=mc))
+    expected = normalize(tmpl.render(this=mc, encoded=encode_rows(data)))
     assert expected in out
+    assert 'function foliumDecodeRows(data,width,ArrayType)' in out
 
 
 @pytest.mark.parametrize('case', [
@@ -69,10 +70,38 @@ def test_fast_marker_cluster():
 ])
 def test_fast_marker_cluster_data(case):
     data = FastMarkerCluster(case).data
-    assert isinstance(data, list)
+    # Numeric arrays are stored as they are.
+    row_type = np.ndarray if isinstance(case, np.ndarray) else list
+    assert isinstance(data, row_type)
     assert len(data) == 3
     for i in range(len(data)):
-        assert isinstance(data[i], list)
+        assert isinstance(data[i], row_type)
         assert len(data[i]) == 3
         assert data[i][0] == float(i)
         assert data[i][1] == float(i + 5)
+
+
+def test_fast_marker_cluster_precluster():
+    data = [[0, 0, 'a'], [0, 0.001, 'b'], [10, 10, 'c']]
+    m = folium.Map([5, 5], zoom_start=4)
+    mc = FastMarkerCluster(data, precluster=True,
+                           disable_clustering_at_zoom=10).add_to(m)
+    assert mc.max_zoom == 9
+    assert mc.clusters[0] == [[3.333333, 3.333667, 3]]
+    assert mc.leaf_zoom[2] < mc.leaf_zoom[0] == 10
+    out = normalize(m._parent.render())
+    assert 'L.markerClusterGroup' not in out
+    assert normalize('var leafZoom = [10, 10, 3];') in out
+
+
+def test_fast_marker_cluster_geoparquet(tmpdir):
+    gpd = pytest.importorskip('geopandas')
+    pytest.importorskip('pyarrow')
+    pytest.importorskip('shapely', minversion='2.0')
+    gdf = gpd.GeoDataFrame({'weight': [0.5, 1.], 'name': ['a', 'b'], 'pop': [1, 2]},
+                           geometry=gpd.points_from_xy([5, 6], [48, 49]))
+    path = str(tmpdir.join('points.parquet'))
+    gdf.to_parquet(path)
+    assert FastMarkerCluster(path).data.tolist() == [[48., 5.], [49., 6.]]
+    fmc = FastMarkerCluster(path, columns=['pop', 'weight'])
+    assert fmc.data.tolist() == [[48., 5., 1., 0.5], [49., 6., 2., 1.]]
@@ -5,14 +5,18 @@ Test HeatMap
 ------------
 """
 
+import json
+
 import folium
 from folium.plugins import HeatMap
-from folium.utilities import normalize
+from folium.utilities import aggregate_points, encode_rows, normalize
 
 from jinja2 import Template
 
 import numpy as np
 
+import pandas as pd
+
 import pytest
 
 
@@ -54,7 +58,7 @@ def test_heat_map():
 
 
 def test_heatmap_data():
-    data = HeatMap(np.array([[3, 4, 1], [5, 6, 1], [7, 8, 0.5]])).data
+    data = HeatMap([[3, 4, 1], [5, 6, 1], [7, 8, 0.5]]).data
     assert isinstance(data, list)
     assert len(data) == 3
     for i in range(len(data)):
@@ -62,8 +66,64 @@ def test_heatmap_data():
         assert len(data[i]) == 3
 
 
+@pytest.mark.parametrize('case', [
+    np.array([[3, 4, 1], [5, 6, 1], [7, 8, 0.5]]),
+    pd.DataFrame({'lat': [3, 5, 7], 'lng': [4, 6, 8], 'weight': [1, 1, 0.5]}),
+])
+def test_heatmap_array_data(case):
+    hm = HeatMap(case)
+    assert isinstance(hm.data, np.ndarray)
+    assert hm.data.tolist() == [[3, 4, 1], [5, 6, 1], [7, 8, 0.5]]
+    assert hm.get_bounds() == [[3, 4], [7, 8]]
+    m = folium.Map()
+    hm.add_to(m)
+    out = normalize(m._parent.render())
+    assert 'L.heatLayer(foliumDecodeRows("{}",3),'.format(encode_rows(hm.data)) in out
+    assert 'function foliumDecodeRows(data,width,ArrayType)' in out
+
+
+def test_heatmap_extra_columns():
+    hm = HeatMap(np.array([[3, 4, 1, 10], [5, 6, 0.5, 20]]))
+    assert hm.data.tolist() == [[3, 4, 1, 10], [5, 6, 0.5, 20]]
+
+
 def test_heat_map_exception():
     with pytest.raises(ValueError):
         HeatMap(np.array([[4, 5, 1], [3, 6, np.nan]]))
     with pytest.raises(Exception):
         HeatMap(np.array([3, 4, 5]))
+
+
+def test_heat_map_geoparquet(tmpdir):
+    gpd = pytest.importorskip('geopandas')
+    pytest.importorskip('pyarrow')
+    pytest.importorskip('shapely', minversion='2.0')
+    gdf = gpd.GeoDataFrame({'weight': [0.5, 1.], 'name': ['a', 'b'], 'pop': [1, 2]},
+                           geometry=gpd.points_from_xy([5, 6], [48, 49]))
+    path = str(tmpdir.join('points.parquet'))
+    gdf.to_parquet(path)
+    hm = HeatMap(path)
+    assert hm.data.tolist() == [[48., 5.], [49., 6.]]
+    hm = HeatMap(path, weight_column='weight')
+    assert hm.data.tolist() == [[48., 5., 0.5], [49., 6., 1.]]
+    assert hm.get_bounds() == [[48., 5.], [49., 6.]]
+
+
+def test_heat_map_aggregate():
+    data = np.array([[48, 5, 1], [48, 5.0001, 2], [49, 6, 0.5]])
+    m = folium.Map()
+    hm = HeatMap(data, aggregate=True, max_zoom=4).add_to(m)
+    out = normalize(m._parent.render())
+    assert encode_rows(data) not in out
+    levels = aggregate_points(data, max_zoom=4, cell_size=20)
+    assert sorted(levels) == [0, 1, 2, 3, 4]
+    assert sorted(levels[4].tolist()) == [[48, 5.00005, 3], [49, 6, 0.5]]
+    assert normalize('var levels = {};'.format(
+        json.dumps({str(z): encode_rows(rows) for z, rows in levels.items()},
+                   sort_keys=True))) in out
+    assert hm.get_bounds() == [[48, 5], [49, 6]]
+
+    levels = aggregate_points(data, max_zoom=12, cell_size=20, max_points=1)
+    assert sorted(levels) == list(range(13))
+    assert all(len(rows) == 1 for rows in levels.values())
+    assert levels[12].tolist() == [[48, 5.00005, 3]]
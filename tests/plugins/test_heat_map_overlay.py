@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+"""
+Test HeatMapOverlay
+-------------------
+"""
+
+import folium
+from folium.plugins import HeatMapOverlay
+from folium.utilities import kernel_density, normalize
+
+import numpy as np
+
+import pytest
+
+
+def test_kernel_density():
+    data = np.array([[48, 2, 2]])
+    density, bounds = kernel_density(data, bounds=[[47, 1], [49, 3]],
+                                     width=100, radius=5)
+    assert density.shape == (149, 100)
+    assert density.sum() == pytest.approx(2)
+    assert np.unravel_index(density.argmax(), density.shape) == (75, 50)
+    assert bounds[0][1] == pytest.approx(1) and bounds[1] == pytest.approx([49, 3])
+
+
+def test_heat_map_overlay():
+    np.random.seed(3141592)
+    data = np.random.normal(size=(1000, 2)) + np.array([[48, 5]])
+    m = folium.Map([48., 5.], zoom_start=6)
+    hmo = HeatMapOverlay(data, width=200, radius=5, opacity=0.8).add_to(m)
+    out = normalize(m._parent.render())
+    assert 'L.imageOverlay("data:image/png;base64,' in out
+    assert '{"opacity": 0.8}' in out
+    (lat_min, lon_min), (lat_max, lon_max) = hmo.get_bounds()
+    assert lat_min < data[:, 0].min() and lat_max > data[:, 0].max()
+    assert lon_min < data[:, 1].min() and lon_max > data[:, 1].max()
+
+    image = HeatMapOverlay._colorize(np.array([[0, 0.5, 1, 2]]), 1,
+                                     HeatMapOverlay.default_gradient)
+    assert image[0, :, 3].tolist() == [0, 128, 255, 255]
+    assert image[0, 2, :3].tolist() == [255, 0, 0]
+
+
+def test_heat_map_overlay_exception():
+    with pytest.raises(ValueError):
+        HeatMapOverlay(np.array([[4, 5, 1], [3, 6, np.nan]]))
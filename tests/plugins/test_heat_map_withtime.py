@@ -5,9 +5,11 @@ Test HeatMapWithTime
 ------------
 """
 
+import json
+
 import folium
 from folium import plugins
-from folium.utilities import normalize
+from folium.utilities import encode_rows, normalize
 
 from jinja2 import Template
 
@@ -80,3 +82,39 @@ def test_heat_map_with_time():
     """)
 
     assert normalize(tmpl.render(this=hm)) in out
+
+
+def test_heat_map_with_time_compact(tmpdir):
+    data = [[[48, 5], [49, 6]], np.array([[48.5, 5.5, 0.5]]), []]
+    m = folium.Map([48., 5.], zoom_start=6)
+    hm = plugins.HeatMapWithTime(data, compact=True, prefetch=3).add_to(m)
+    assert hm.data[0].tolist() == [[48, 5, 1], [49, 6, 1]]
+    assert hm.data[2].shape == (0, 3)
+    out = normalize(m._parent.render())
+    frames = [encode_rows(frame, dtype='<f4') for frame in hm.data]
+    assert 'new TDHeatmap({},'.format(json.dumps(frames).replace(', ', ',')) in out
+    assert 'frameUrl: null,nFrames: 3,prefetch: 3,cacheSize: 16' in out
+    assert 'foliumDecodeArray(this.data[time-1],Float32Array)' in out
+    assert 'function foliumDecodeArray(data,ArrayType)' in out
+
+    frames_dir = str(tmpdir.join('frames'))
+    m = folium.Map([48., 5.], zoom_start=6)
+    hm = plugins.HeatMapWithTime(data, frames_dir=frames_dir,
+                                 frames_url='frames/').add_to(m)
+    out = normalize(m._parent.render())
+    assert 'new TDHeatmap(null,' in out
+    assert 'function foliumDecodeArray' not in out
+    assert 'frameUrl: "frames/{}_{{index}}.bin"'.format(hm.get_name()) in out
+    with open(tmpdir.join('frames', hm.get_name() + '_1.bin'), 'rb') as f:
+        assert np.frombuffer(f.read(), dtype='<f4').tolist() == [48.5, 5.5, 0.5]
+
+
+def test_heat_map_with_time_bounds():
+    data = [[[48, 5], [49, 6, 0.5]], [], [[47, 7]], [[50, 4.5, 1]]]
+    hm = plugins.HeatMapWithTime(data)
+    assert hm.get_bounds() == [[47, 4.5], [50, 7]]
+    assert hm._bounds is not None
+    compact = plugins.HeatMapWithTime([[point[:2] for point in frame]
+                                       for frame in data], compact=True)
+    assert compact.get_bounds() == [[47, 4.5], [50, 7]]
+    assert plugins.HeatMapWithTime([[], []]).get_bounds() == [[None, None], [None, None]]
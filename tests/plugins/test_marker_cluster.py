@@ -5,6 +5,8 @@ Test MarkerCluster
 ------------------
 """
 
+from unittest import mock
+
 import folium
 from folium import plugins
 from folium.utilities import normalize
@@ -13,6 +15,8 @@ from jinja2 import Template
 
 import numpy as np
 
+import pytest
+
 
 def test_marker_cluster():
     N = 100
@@ -55,3 +59,29 @@ def test_marker_cluster():
     bounds = m.get_bounds()
     assert bounds == [[35.147332572663785, -11.520684337300109],
                       [59.839718052359274, 29.94931046497927]], bounds
+
+
+def test_marker_cluster_bulk():
+    data = np.array([[35., -10.], [40., 5.], [60., 30.]])
+    icons = [folium.Icon(color='red'), None, {'color': 'red'}]
+    m = folium.Map([45., 3.], zoom_start=4)
+    mc = plugins.MarkerCluster(data, popups=['a', None, '<b>c</b>'],
+                               icons=icons, bulk=True).add_to(m)
+    assert not mc._children
+    assert mc.icon_codes == [0, 1, 0]
+    assert mc.icons[1] is None and mc.icons[0]['markerColor'] == 'red'
+    assert m.get_bounds() == [[35, -10], [60, 30]]
+
+    out = normalize(m._parent.render())
+    assert normalize('var locations = [[35.0, -10.0], [40.0, 5.0], [60.0, 30.0]];') in out
+    assert '.addLayers(markers);' in out
+
+    # The same without pandas, which is optional.
+    with mock.patch('folium.utilities.pd', None):
+        mc = plugins.MarkerCluster(data, icons=icons, bulk=True)
+    assert mc.icon_codes == [0, 1, 0]
+
+    with pytest.raises(ValueError):
+        plugins.MarkerCluster(data, popups=['a'], bulk=True)
+    with pytest.raises(TypeError):
+        plugins.MarkerCluster(data, popups=[folium.Popup('a')] * 3, bulk=True)
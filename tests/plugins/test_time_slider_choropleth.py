@@ -4,12 +4,14 @@ tests TimeSliderChoropleth
 
 """
 
+import base64
 import json
 
 from branca.colormap import linear
 
 import folium
 from folium.plugins import TimeSliderChoropleth
+from folium.utilities import normalize
 
 
 import numpy as np
@@ -80,3 +82,34 @@ def test_timedynamic_geo_json():
 
     expected_styledict = json.dumps(styledict, sort_keys=True, indent=2)
     assert expected_styledict in rendered
+
+
+def test_time_slider_choropleth_compact():
+    data = {'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'id': str(i), 'properties': {},
+         'geometry': {'type': 'Point', 'coordinates': [i, i]}}
+        for i in range(3)
+    ]}
+    styledict = {
+        '0': {'1': {'color': 'red', 'opacity': 0.5},
+              '2': {'color': 'blue', 'opacity': 0.5}},
+        '1': {'2': {'color': 'red', 'opacity': 0.5}},
+        '2': {'1': {'color': 'red', 'opacity': 1},
+              '2': {'color': 'red', 'opacity': 0.5}},
+    }
+    m = folium.Map()
+    tsc = TimeSliderChoropleth(data, styledict, compact=True).add_to(m)
+    out = m._parent.render()
+
+    assert tsc.timestamps == ['1', '2']
+    assert tsc.feature_ids == ['0', '1', '2']
+    assert tsc.palette == [{'color': 'red', 'opacity': 0.5},
+                           {'color': 'blue', 'opacity': 0.5},
+                           {'color': 'red', 'opacity': 1}]
+    assert tsc.codes_type == 'Uint8Array'
+    codes = np.frombuffer(base64.b64decode(tsc.encoded_codes), dtype='<u1')
+    assert codes.reshape(3, 2).tolist() == [[0, 1], [255, 0], [2, 0]]
+    assert 'var styledict' not in out
+    assert 'var style_codes = foliumDecodeArray("{}",Uint8Array);'.format(
+        tsc.encoded_codes) in normalize(out)
+    assert 'function foliumDecodeArray(data, ArrayType)' in out
@@ -6,6 +6,10 @@ Test TimestampedGeoJson
 
 """
 
+import io
+import json
+from unittest import mock
+
 import folium
 from folium import plugins
 from folium.utilities import normalize
@@ -14,6 +18,8 @@ from jinja2 import Template
 
 import numpy as np
 
+import pandas as pd
+
 
 def test_timestamped_geo_json():
     coordinates = [[[[lon-8*np.sin(theta), -47+6*np.cos(theta)] for
@@ -168,3 +174,82 @@ def test_timestamped_geo_json():
 
     bounds = m.get_bounds()
     assert bounds == [[-53.0, -158.0], [50.0, 158.0]], bounds
+
+
+def test_timestamped_geo_json_ndjson(tmpdir):
+    features = [
+        {'type': 'Feature',
+         'geometry': {'type': 'Point', 'coordinates': [i, -i]},
+         'properties': {'times': [1435708800000 + i * 86400000]}}
+        for i in range(3)
+    ]
+    path = str(tmpdir.join('points.ndjson'))
+    with open(path, 'w') as f:
+        f.write('\n'.join(json.dumps(feature) for feature in features) + '\n')
+
+    expected = {'type': 'FeatureCollection', 'features': features}
+    tgj = plugins.TimestampedGeoJson(path)
+    assert json.loads(tgj.data) == expected
+    tgj = plugins.TimestampedGeoJson(json.dumps(f) for f in features)
+    assert json.loads(tgj.data) == expected
+    assert tgj._get_self_bounds() == [[-2, 0], [0, 2]]
+
+    url = 'https://example.com/points.ndjson'
+    with open(path, 'rb') as f:
+        content = f.read()
+    with mock.patch('folium.plugins.timestamped_geo_json.get_url',
+                    return_value=io.BytesIO(content)) as get_url:
+        tgj = plugins.TimestampedGeoJson(url)
+    get_url.assert_called_once_with(url, stream=True)
+    assert json.loads(tgj.data) == expected
+
+
+def test_timestamped_geo_json_from_dataframe():
+    df = pd.DataFrame({
+        'id': ['b', 'a', 'a', 'b', 'c'],
+        'time': pd.to_datetime(['2020-01-01 00:00:01', '2020-01-01 00:00:00',
+                                '2020-01-01 00:00:01', '2020-01-01 00:00:00',
+                                '2020-01-02 00:00:00']),
+        'lat': [1., 2., 3., 4., 5.],
+        'lon': [10., 20., 30., 40., 50.],
+        'color': ['red', 'blue', 'blue', 'red', 'red'],
+    })
+    tgj = plugins.TimestampedGeoJson.from_dataframe(
+        df, style_columns={'color': 'color'}, popup_column='id')
+    assert tgj.tables == {
+        'times': ['2020-01-01T00:00:00', '2020-01-01T00:00:01',
+                  '2020-01-02T00:00:00'],
+        'styles': [{'color': 'blue'}, {'color': 'red'}],
+    }
+    features = json.loads(tgj.data)['features']
+    assert [f['geometry'] for f in features] == [
+        {'type': 'LineString', 'coordinates': [[20, 2], [30, 3]]},
+        {'type': 'LineString', 'coordinates': [[40, 4], [10, 1]]},
+        {'type': 'Point', 'coordinates': [50, 5]},
+    ]
+    assert [f['properties'] for f in features] == [
+        {'id': 'a', 'times': [0, 1], 'style': 0, 'popup': 'a'},
+        {'id': 'b', 'times': [0, 1], 'style': 1, 'popup': 'b'},
+        {'id': 'c', 'times': [2], 'style': 1, 'popup': 'c'},
+    ]
+
+    m = folium.Map()
+    tgj.add_to(m)
+    out = normalize(m._parent.render())
+    assert 'var {}_tables = '.format(tgj.get_name()) in out
+    assert 'geoJsonLayer.eachLayer(' in out
+
+
+def test_timestamped_geo_json_from_dataframe_sorts_parsed_times():
+    df = pd.DataFrame({
+        'id': ['a', 'a', 'a'],
+        'time': ['1/2/2020', '12/31/2019', '1/10/2020'],
+        'lat': [2., 1., 3.],
+        'lon': [20., 10., 30.],
+    })
+    tgj = plugins.TimestampedGeoJson.from_dataframe(df)
+    assert tgj.tables['times'] == ['2019-12-31T00:00:00', '2020-01-02T00:00:00',
+                                   '2020-01-10T00:00:00']
+    feature = json.loads(tgj.data)['features'][0]
+    assert feature['geometry']['coordinates'] == [[10, 1], [20, 2], [30, 3]]
+    assert feature['properties']['times'] == [0, 1, 2]
@@ -6,13 +6,21 @@ Folium Features Tests
 
 """
 
+import io
+import json
 import os
 import warnings
+from unittest import mock
 
 from branca.element import Element
 
 import folium
-from folium import Map, Popup, GeoJson
+from folium import Map, Popup, GeoJson, TopoJson
+from folium.utilities import iter_geojson_features, normalize
+
+import numpy as np
+
+import pandas as pd
 
 import pytest
 
@@ -303,3 +311,408 @@ def test_geojson_find_identifier():
     geojson.convert_to_feature_collection()
     assert geojson.find_identifier() == 'feature.id'
     assert geojson.data['features'][0]['id'] == '0'
+
+
+def _make_feature_collection(n):
+    return {'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'id': str(i),
+         'properties': {'value': i, 'party': 'a' if i % 2 else 'b'},
+         'geometry': {'type': 'Point', 'coordinates': [i, i]}}
+        for i in range(n)]}
+
+
+def test_geojson_style_columns():
+    data = _make_feature_collection(6)
+    geojson = GeoJson(data, style_function={
+        'fillColor': np.array(['red', 'blue', 'red', 'red', 'blue', 'red']),
+        'weight': pd.Series([1, 2, 1, 1, 2, 1]),
+        'opacity': 0.5,
+    })
+    geojson.add_to(Map())
+    geojson.render()
+    assert geojson.style_map == {
+        '{"fillColor": "blue", "opacity": 0.5, "weight": 2}': ['1', '4'],
+        'default': '{"fillColor": "red", "opacity": 0.5, "weight": 1}',
+    }
+
+    with pytest.raises(ValueError):
+        GeoJson(data, style_function={'fillColor': ['red', 'blue']})
+
+
+def test_geojson_style_vectorized():
+    def style_function(properties):
+        return {'fillColor': np.where(properties['party'] == 'a', 'red', 'blue'),
+                'weight': 1}
+
+    geojson = GeoJson(_make_feature_collection(5), vectorized=True,
+                      style_function=style_function,
+                      highlight_function=lambda df: {'weight': df['value'] * 0 + 3})
+    geojson.add_to(Map())
+    geojson.render()
+    assert geojson.style_map == {
+        '{"fillColor": "red", "weight": 1}': ['1', '3'],
+        'default': '{"fillColor": "blue", "weight": 1}',
+    }
+    assert geojson.highlight_map == {'default': '{"weight": 3}'}
+
+
+def test_geojson_style_keys():
+    calls = []
+
+    def style_function(feature):
+        calls.append(feature['id'])
+        return {'fillColor': 'red' if feature['properties']['party'] == 'a' else 'blue'}
+
+    geojson = GeoJson(_make_feature_collection(10), style_function=style_function,
+                      style_keys=['party'])
+    geojson.add_to(Map())
+    geojson.render()
+    # One call during validation, one for the other party.
+    assert calls == ['0', '1']
+    assert geojson.style_map == {
+        '{"fillColor": "blue"}': ['0', '2', '4', '6', '8'],
+        'default': '{"fillColor": "red"}',
+    }
+    assert geojson.cache_info['style'] == {
+        'hits': 8, 'misses': 2, 'hit_rate': 0.8,
+        'distinct_inputs': 2, 'distinct_styles': 2,
+    }
+    geojson.render()
+    assert len(calls) == 2
+    assert geojson.cache_info['style']['hits'] == 10
+    assert geojson.cache_info['style']['misses'] == 0
+
+    geojson.style_function = lambda feature: {'fillColor': 'green'}
+    geojson.render()
+    assert geojson.style_map == {'default': '{"fillColor": "green"}'}
+    assert geojson.cache_info['style']['misses'] == 2
+
+
+def test_geojson_compact_styles():
+    data = _make_feature_collection(4)
+    for feature in data['features']:
+        del feature['id']
+    geojson = GeoJson(data, compact_styles=True,
+                      style_function={'fillColor': ['red', 'blue', 'red', 'red']},
+                      highlight_function={'weight': 3})
+    m = Map()
+    geojson.add_to(m)
+    out = normalize(m._parent.render())
+
+    assert geojson.style_lookup == {
+        'palette': ['{"fillColor": "red"}', '{"fillColor": "blue"}'],
+        'index': [0, 1, 0, 0],
+    }
+    assert geojson.highlight_lookup == {
+        'palette': ['{"weight": 3}'],
+        'index': [0, 0, 0, 0],
+    }
+    name = geojson.get_name()
+    assert 'switch(' not in out
+    assert 'var {}_styles = [{{"fillColor": "red"}},{{"fillColor": "blue"}},];'.format(name) in out
+    assert 'var {}_style_index = [0,1,0,0];'.format(name) in out
+    assert 'function {}_highlighter(feature)'.format(name) in out
+
+    geojson = GeoJson(_make_feature_collection(3), compact_styles=True,
+                      style_function={'fillColor': ['red', 'red', 'blue']})
+    geojson.add_to(Map())
+    geojson.render()
+    assert geojson.style_lookup['index'] == [0, 0, 1]
+
+
+def test_geojson_find_identifier_id_field():
+    data = _make_feature_collection(3)
+    geojson = GeoJson(data, id_field='properties.value')
+    assert geojson.find_identifier() == 'feature.properties.value'
+    geojson = GeoJson(data, id_field='feature.id')
+    assert geojson.find_identifier() == 'feature.id'
+
+    # The 'id' is preferred over the properties, even if it comes last.
+    data['features'][2]['properties']['value'] = 0
+    geojson = GeoJson(data)
+    assert geojson.find_identifier() == 'feature.id'
+    data['features'][1]['id'] = '0'
+    assert geojson.find_identifier() == 'feature.id'
+    assert data['features'][1]['id'] == '1'
+
+
+def test_geojson_find_identifier_id_property():
+    data = {'type': 'FeatureCollection', 'features': [
+        {'type': 'Feature', 'properties': {'id': i},
+         'geometry': {'type': 'Point', 'coordinates': [0, 0]}}
+        for i in range(3)
+    ]}
+    geojson = GeoJson(data)
+    assert geojson.find_identifier() == 'feature.properties.id'
+    assert all('id' not in feature for feature in data['features'])
+
+
+@pytest.mark.parametrize('use_ijson', [False, True])
+def test_iter_geojson_features(use_ijson):
+    if use_ijson:
+        pytest.importorskip('ijson')
+    data = _make_feature_collection(20)
+    data['crs'] = {'type': 'name', 'properties': {'name': 'EPSG:4326'}}
+    text = json.dumps(data)
+    features = list(iter_geojson_features(io.BytesIO(text.encode()),
+                                          use_ijson=use_ijson, chunk_size=7))
+    assert features == data['features']
+
+    geometry = {'type': 'Point', 'coordinates': [1.5, 2]}
+    features = list(iter_geojson_features(io.BytesIO(json.dumps(geometry).encode()),
+                                          use_ijson=use_ijson, chunk_size=3))
+    assert features == [{'type': 'Feature', 'geometry': geometry}]
+
+
+def test_geojson_stream(tmpdir):
+    data = _make_feature_collection(10)
+    data['features'][0]['geometry'] = {
+        'type': 'LineString',
+        'coordinates': [[0, 0], [1, 0.001], [2, 0], [3, 5]]}
+    path = str(tmpdir.join('features.json'))
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+    geojson = GeoJson(path, stream=True, keep_properties=['party'],
+                      feature_filter=lambda f: f['properties']['value'] < 5,
+                      simplify_tolerance=0.01)
+    features = geojson.data['features']
+    assert len(features) == 5
+    assert features[1]['properties'] == {'party': 'a'}
+    assert features[0]['geometry']['coordinates'] == [[0, 0], [2, 0], [3, 5]]
+    assert geojson.get_bounds() == [[0, 0], [5, 4]]
+    # The caller's data isn't changed.
+    assert len(data['features'][0]['geometry']['coordinates']) == 4
+
+    geojson = GeoJson(iter(data['features']), keep_properties=[])
+    assert len(geojson.data['features']) == 10
+    assert geojson.data['features'][3]['properties'] == {}
+    assert data['features'][3]['properties']['value'] == 3
+
+    with open(path) as f:
+        geojson = GeoJson(f)
+    assert geojson.data == {'type': 'FeatureCollection',
+                            'features': data['features']}
+
+    with pytest.raises(ValueError):
+        GeoJson(path, embed=False, keep_properties=['party'])
+
+
+def test_geojson_geopandas():
+    gpd = pytest.importorskip('geopandas')
+    pytest.importorskip('shapely', minversion='2.0')
+    gdf = gpd.read_file(os.path.join(rootpath, 'us-states.json'))
+    expected = json.loads(json.dumps(gdf.__geo_interface__))
+
+    with mock.patch.object(gpd.GeoDataFrame, 'to_crs') as to_crs:
+        geojson = GeoJson(gdf)
+    # The data is in EPSG:4326 already.
+    to_crs.assert_not_called()
+    for feature, expected_feature in zip(geojson.data['features'],
+                                         expected['features']):
+        assert feature['id'] == expected_feature['id']
+        assert feature['properties'] == expected_feature['properties']
+        assert feature['geometry'] == expected_feature['geometry']
+
+    geojson = GeoJson(gdf.to_crs(epsg=3857))
+    np.testing.assert_allclose(geojson.get_bounds(),
+                               GeoJson(expected).get_bounds())
+
+
+def test_geojson_geopandas_geometry_only():
+    gpd = pytest.importorskip('geopandas')
+    pytest.importorskip('shapely', minversion='2.0')
+    gdf = gpd.GeoDataFrame(geometry=gpd.points_from_xy([5, 6], [48, 49]), crs=4326)
+    features = GeoJson(gdf).data['features']
+    assert [feature['properties'] for feature in features] == [{}, {}]
+    assert [feature['geometry'] for feature in features] == [
+        {'type': 'Point', 'coordinates': [5.0, 48.0]},
+        {'type': 'Point', 'coordinates': [6.0, 49.0]},
+    ]
+
+
+@pytest.mark.parametrize('encoding', ['WKB', 'geoarrow'])
+def test_geojson_geoparquet(tmpdir, encoding):
+    gpd = pytest.importorskip('geopandas')
+    pytest.importorskip('pyarrow')
+    pytest.importorskip('shapely', minversion='2.0')
+    gdf = gpd.read_file(os.path.join(rootpath, 'us-states.json'))
+    # GeoArrow needs a single geometry type per column.
+    gdf = gdf[gdf.geom_type == 'Polygon'].reset_index(drop=True)
+    path = str(tmpdir.join('states.parquet'))
+    gdf.to_parquet(path, geometry_encoding=encoding)
+    expected = json.loads(json.dumps(gdf.__geo_interface__))
+
+    geojson = GeoJson(path)
+    for feature, expected_feature in zip(geojson.data['features'],
+                                         expected['features']):
+        assert feature['properties'] == expected_feature['properties']
+        assert feature['geometry'] == expected_feature['geometry']
+    np.testing.assert_allclose(geojson.get_bounds(),
+                               GeoJson(expected).get_bounds())
+
+    geojson = GeoJson(path, keep_properties=['name'])
+    assert geojson.data['features'][0]['properties'] == {'name': gdf.name[0]}
+
+
+def test_geojson_arrow_field_metadata():
+    gpd = pytest.importorskip('geopandas')
+    pa = pytest.importorskip('pyarrow')
+    pytest.importorskip('shapely', minversion='2.0')
+    gdf = gpd.GeoDataFrame({'name': ['a', 'b']},
+                           geometry=gpd.points_from_xy([5, 6], [48, 49]), crs=4326)
+    # Without geoarrow-pyarrow the GeoArrow type is only in the field metadata.
+    table = pa.table(gdf.to_arrow(geometry_encoding='geoarrow'))
+    assert table.schema.field('geometry').metadata[b'ARROW:extension:name'] == b'geoarrow.point'
+    features = GeoJson(table).data['features']
+    assert [feature['geometry'] for feature in features] == [
+        {'type': 'Point', 'coordinates': [5.0, 48.0]},
+        {'type': 'Point', 'coordinates': [6.0, 49.0]},
+    ]
+    assert [feature['properties'] for feature in features] == [{'name': 'a'}, {'name': 'b'}]
+
+    table = pa.table(gdf.to_crs(epsg=3857).to_arrow(geometry_encoding='geoarrow'))
+    with pytest.raises(ValueError, match='longitude'):
+        GeoJson(table)
+
+
+def test_geojson_ndjson(tmpdir):
+    data = _make_feature_collection(5)
+    path = str(tmpdir.join('points.ndjson'))
+    with open(path, 'w') as f:
+        for feature in data['features']:
+            f.write('\x1e' + json.dumps(feature) + '\n')
+
+    assert GeoJson(path).data == data
+    with open(path) as f:
+        assert GeoJson(f.readlines()).data == data
+    assert GeoJson(path, keep_properties=['party']).get_bounds() == [[0, 0], [4, 4]]
+
+    geojson = GeoJson(path, embed=False)
+    assert geojson.ndjson_link == path
+    assert geojson.data == data
+
+    sidecar = str(tmpdir.join('layer.ndjson'))
+    m = Map()
+    GeoJson(data, ndjson_sidecar=sidecar).add_to(m)
+    out = m._parent.render()
+    assert 'fetch({})'.format(json.dumps(sidecar)) in out
+    assert json.dumps(data['features'][0]) not in out
+    with open(sidecar) as f:
+        assert [json.loads(line) for line in f] == data['features']
+
+    sidecar = str(tmpdir.join('site', 'data', 'layer.ndjson'))
+    tmpdir.mkdir('site').mkdir('data')
+    m = Map()
+    GeoJson(data, ndjson_sidecar=sidecar, ndjson_url='data/layer.ndjson').add_to(m)
+    out = m._parent.render()
+    assert 'fetch("data/layer.ndjson")' in out
+    assert json.dumps(sidecar) not in out
+    with open(sidecar) as f:
+        assert [json.loads(line) for line in f] == data['features']
+
+
+def test_geojson_spatial_index():
+    data = _make_feature_collection(50)
+    geojson = GeoJson(data)
+    assert geojson.query_bounds([[9.5, 9.5], [12, 20]]) == data['features'][10:13]
+    assert geojson.query_point([7, 7]) == [data['features'][7]]
+    assert list(geojson.query_point([7.5, 7], return_positions=True)) == []
+
+
+def test_geojson_clip_to():
+    data = _make_feature_collection(50)
+    colors = ['red' if i % 3 else 'blue' for i in range(50)]
+    m = Map(max_bounds=True, min_lat=5, max_lat=9, min_lon=0, max_lon=20)
+    geojson = GeoJson(data, clip_to=True,
+                      style_function={'color': colors}).add_to(m)
+    out = m._parent.render()
+    assert geojson.style_map == {'{"color": "blue"}': ['6', '9'],
+                                 'default': '{"color": "red"}'}
+    for i in range(50):
+        assert ('"id": "{}",'.format(i) in out) == (5 <= i <= 9)
+    assert len(geojson.data['features']) == 50
+
+    m = Map()
+    GeoJson(data, clip_to=[[0, 0], [1, 1]]).add_to(m)
+    out = m._parent.render()
+    assert '"id": "1",' in out
+    assert '"id": "2",' not in out
+
+
+@pytest.mark.parametrize('style_keys', [None, ['party']])
+def test_geojson_clip_to_no_features(style_keys):
+    data = _make_feature_collection(5)
+    m = Map()
+    geojson = GeoJson(data, clip_to=[[50, 50], [60, 60]],
+                      style_function=lambda feature: {'color': 'red'},
+                      highlight_function=lambda feature: {'weight': 3},
+                      style_keys=style_keys).add_to(m)
+    out = m._parent.render()
+    assert '"id": "0",' not in out
+    assert geojson.style_map == {'default': '{}'}
+    assert len(geojson.data['features']) == 5
+
+
+def test_topojson_style_table():
+    with open(os.path.join(rootpath, 'or_counties_topo.json')) as f:
+        data = json.load(f)
+    expected = json.dumps(data, sort_keys=True)
+    calls = []
+
+    def style_function(geometry):
+        calls.append(geometry)
+        return {'color': 'red' if len(calls) % 2 else 'blue'}
+
+    topo_json = TopoJson(data, 'objects.or_counties_geo',
+                         style_function=style_function)
+    m = Map()
+    topo_json.add_to(m)
+    out = m._parent.render()
+    n_geometries = len(data['objects']['or_counties_geo']['geometries'])
+    assert topo_json.style_table == {
+        'palette': [{'color': 'red'}, {'color': 'blue'}],
+        'index': [i % 2 for i in range(n_geometries)]}
+    assert '{}_style_index'.format(topo_json.get_name()) in out
+    # The data is left as is and the table is reused.
+    assert json.dumps(data, sort_keys=True) == expected
+    m._parent.render()
+    assert len(calls) == n_geometries
+
+    assert topo_json.get_bounds() == [[41.99187135900012, -124.56617536999985],
+                                      [46.28768217800006, -116.46422312599977]]
+
+
+def test_geojson_keep_properties_auto():
+    data = _make_feature_collection(4)
+    for feature in data['features']:
+        feature['properties'].update(name='f' + feature['id'], extra=[1, 2, 3])
+    expected = json.dumps(data, sort_keys=True)
+    m = Map()
+    geojson = GeoJson(data, keep_properties='auto',
+                      style_function=lambda x: {'color': x['properties']['party']},
+                      tooltip=folium.GeoJsonTooltip(fields=['name']))
+    geojson.add_to(m)
+    out = m._parent.render()
+    assert '"extra"' not in out and '"party"' not in out
+    assert '"name": "f0"' in out
+    assert geojson.get_required_properties() == {'name'}
+    assert json.dumps(data, sort_keys=True) == expected
+
+    m = Map()
+    folium.Choropleth(data, data={'a': 1, 'b': 2}, key_on='feature.properties.party',
+                      fill_color='BuPu', bins=3, keep_properties='auto').add_to(m)
+    out = m._parent.render()
+    assert '"party": "a"' in out and '"extra"' not in out
+
+
+def test_color_line_merges_runs():
+    positions = np.array([[0, 0], [0, 1], [0, 2], [0, 3], [0, 4], [0, 5]])
+    colors = np.array([0., 0., 1., 1., 0.])
+    color_line = folium.ColorLine(positions, colors,
+                                  colormap=['blue', 'red'], nb_steps=2)
+    lines = list(color_line._children.values())
+    assert len(lines) == 2
+    assert lines[0].locations == [[[0, 0], [0, 1], [0, 2]], [[0, 4], [0, 5]]]
+    assert lines[1].locations == [[[0, 2], [0, 3], [0, 4]]]
+    assert lines[0].options['color'] != lines[1].options['color']
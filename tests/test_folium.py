@@ -10,6 +10,7 @@ import json
 import os
 
 import branca.element
+from branca.utilities import color_brewer
 
 import folium
 from folium.features import GeoJson, Choropleth
@@ -250,6 +251,66 @@ class TestFolium(object):
             fill_color=fill_color,
             columns=columns)
 
+    def test_choropleth_style_map(self):
+        """Test that features are joined to the data and grouped by color."""
+        geo_data = {'type': 'FeatureCollection', 'features': [
+            {'type': 'Feature', 'id': str(i), 'properties': {},
+             'geometry': {'type': 'Point', 'coordinates': [i, i]}}
+            for i in range(5)]}
+        data = pd.Series([0., 1., 10., float('nan'), 3.],
+                         index=['0', '1', '2', '3', '4'])
+        choropleth = Choropleth(geo_data, data=data, key_on='feature.id',
+                                bins=[0, 5, 10, 20], fill_color='BuPu',
+                                nan_fill_color='grey', nan_fill_opacity=0.1,
+                                highlight=True)
+        choropleth.add_to(folium.Map())
+        choropleth._parent._parent.render()
+        style_map = choropleth.geojson.style_map
+        default = json.loads(style_map.pop('default'))
+        colors = color_brewer('BuPu', n=3)
+        assert default['fillColor'] == colors[0]
+        assert {json.loads(key)['fillColor']: (json.loads(key)['fillOpacity'], ids)
+                for key, ids in style_map.items()} == {
+            colors[2]: (0.6, ['2']), 'grey': (0.1, ['3'])}
+        # The constant highlight style is passed as a dict, not a function.
+        assert choropleth.geojson.highlight_map == {
+            'default': json.dumps({'fillOpacity': 0.8, 'weight': 3}, sort_keys=True)}
+
+    def test_choropleth_jenks(self):
+        """Test that the legend of a Choropleth uses the Jenks breaks."""
+        with open(os.path.join(rootpath, 'us-states.json')) as f:
+            geo_data = json.load(f)
+        data = pd.Series([1, 2, 3, 10, 11, 12, 30, 31, 100],
+                         index=['AL', 'AK', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL'])
+        choropleth = Choropleth(geo_data, data=data, key_on='feature.id',
+                                fill_color='BuPu', bins=('jenks', 4))
+        np.testing.assert_allclose(choropleth.color_scale.index,
+                                   [1, 6.5, 21, 65.5, 100])
+
+    def test_choropleth_several_metrics(self):
+        """Test that several metrics share the geometries of one layer."""
+        with open(os.path.join(rootpath, 'us-states.json')) as f:
+            geo_data = json.load(f)
+        ids = [feature['id'] for feature in geo_data['features']]
+        data = pd.DataFrame({'state': ids[:-1],
+                             'a': np.arange(len(ids) - 1),
+                             'b': np.arange(len(ids) - 1)[::-1]})
+        m = folium.Map()
+        choropleth = Choropleth(geo_data, data=data, columns=['state', 'a', 'b'],
+                                key_on='feature.id', fill_color='YlGn',
+                                bins=3).add_to(m)
+        out = m._parent.render()
+
+        assert out.count('"coordinates"') == len(ids)
+        assert [color_scale.caption for color_scale in choropleth.color_scales] == ['a', 'b']
+        metrics = choropleth.metric_control.metrics
+        assert [metric['name'] for metric in metrics] == ['a', 'b']
+        # One character per feature, with the last one missing from the data.
+        assert metrics[0]['codes'][0] == '0' and metrics[1]['codes'][0] == '2'
+        assert metrics[0]['codes'][-1] == metrics[1]['codes'][-1] == '3'
+        assert metrics[0]['palette'][-1] == 'black'
+        assert choropleth.metric_control.get_name() in out
+
     def test_choropleth_warning(self):
         """Test that the Map.choropleth method works and raises a warning."""
         self.setup()
@@ -1,9 +1,20 @@
+import http.server
+import json
+import threading
+from unittest import mock
+
 import numpy as np
 import pandas as pd
 import pytest
 
-from folium import Map, FeatureGroup, Marker, Popup
+from folium import Map, FeatureGroup, GeoJson, Marker, Popup
 from folium.utilities import (
+    cluster_points,
+    factorize,
+    get_bin_edges,
+    get_url,
+    prefetch_urls,
+    set_http_cache,
     validate_location,
     validate_locations,
     if_pandas_df_convert_to_numpy,
@@ -154,3 +165,131 @@ def test_parse_options():
     assert parse_options(thing=None) == {}
     assert parse_options(long_thing=42) == {'longThing': 42}
     assert parse_options(thing=42, lst=[1, 2]) == {'thing': 42, 'lst': [1, 2]}
+
+
+@pytest.fixture
+def http_server():
+    """Serve a GeoJSON file from a local HTTP server.
+
+    Paths starting with '/plain' are served without an ETag.
+    """
+    requests_seen = []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        body = json.dumps({'type': 'FeatureCollection', 'features': []}).encode()
+        etag = '"v1"'
+
+        def do_GET(self):
+            requests_seen.append((self.path, self.headers.get('If-None-Match')))
+            if self.headers.get('If-Modified-Since'):
+                raise AssertionError('Unexpected If-Modified-Since header.')
+            if self.headers.get('If-None-Match') == self.etag:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            if not self.path.startswith('/plain'):
+                self.send_header('ETag', self.etag)
+            self.send_header('Content-Length', str(len(self.body)))
+            self.end_headers()
+            self.wfile.write(self.body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = 'http://127.0.0.1:{}'.format(server.server_address[1])
+    yield url, requests_seen
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_url_cache(http_server, tmpdir):
+    url, requests_seen = http_server
+    set_http_cache(str(tmpdir), max_age=None)
+    try:
+        for _ in range(2):
+            with get_url(url + '/a.json') as f:
+                assert json.load(f) == {'type': 'FeatureCollection', 'features': []}
+        # The second request is revalidated with the ETag.
+        assert requests_seen == [('/a.json', None), ('/a.json', '"v1"')]
+
+        set_http_cache(str(tmpdir), max_age=60)
+        GeoJson(url + '/a.json')
+        assert len(requests_seen) == 2
+
+        # Without validators from the server, there is nothing to revalidate.
+        set_http_cache(str(tmpdir), max_age=None)
+        for _ in range(2):
+            with get_url(url + '/plain.json') as f:
+                assert json.load(f) == {'type': 'FeatureCollection', 'features': []}
+        assert requests_seen[2:] == [('/plain.json', None), ('/plain.json', None)]
+    finally:
+        set_http_cache(None)
+
+
+def test_prefetch_urls(http_server):
+    url, requests_seen = http_server
+    urls = [url + '/{}.json'.format(i) for i in range(4)]
+    prefetch_urls(urls)
+    assert sorted(path for path, _ in requests_seen) == ['/0.json', '/1.json', '/2.json', '/3.json']
+    layers = [GeoJson(u) for u in urls]
+    assert len(requests_seen) == 4
+    assert all(layer.data['type'] == 'FeatureCollection' for layer in layers)
+    # Prefetched content is used once.
+    GeoJson(urls[0], stream=True)
+    assert len(requests_seen) == 5
+
+    # Content that wasn't used within the block is discarded.
+    with prefetch_urls(urls[:2]):
+        GeoJson(urls[0])
+    assert len(requests_seen) == 7
+    GeoJson(urls[1])
+    assert len(requests_seen) == 8
+
+
+def test_get_bin_edges():
+    values = [1, 2, 3, 10, 11, 12, 30, 31, 100]
+    np.testing.assert_allclose(get_bin_edges(values, ('jenks', 4)),
+                               [1, 6.5, 21, 65.5, 100])
+    np.testing.assert_allclose(get_bin_edges(values, ('quantile', 3)),
+                               np.quantile(values, [0, 1 / 3, 2 / 3, 1]))
+    np.testing.assert_allclose(get_bin_edges(values, ('equal_count', 3)),
+                               [1, 6.5, 21, 100])
+    # Duplicates stay in one bin, which leaves fewer bins.
+    np.testing.assert_allclose(get_bin_edges([1, 1, 1, 1, 2], ('equal_count', 3)),
+                               [1, 2])
+    np.testing.assert_allclose(get_bin_edges(values, 4),
+                               np.histogram(values, bins=4)[1])
+    # Sequences of edges are passed to numpy as is.
+    for edges in [(0, 10, 20, 30, 100), (0, 100), np.array([0, 50, 100]), [0, 100]]:
+        np.testing.assert_allclose(get_bin_edges(values, edges), edges)
+
+    # Large inputs are sampled, the extremes are kept.
+    values = np.random.RandomState(0).lognormal(size=100000)
+    edges = get_bin_edges(values, 'jenks', max_samples=500)
+    assert len(edges) == 7
+    assert edges[0] == values.min() and edges[-1] == values.max()
+
+
+def test_cluster_points():
+    locations = [[0, 0], [0, 0.001], [0.001, 0], [10, 10]]
+    clusters, leaf_zoom = cluster_points(locations, max_zoom=12, radius=80)
+    assert sorted(clusters) == list(range(min(clusters), 13))
+    assert clusters[0].tolist() == [[2.50025, 2.50025, 4]]
+    # Clusters hold every point that is not drawn on its own.
+    for zoom, rows in clusters.items():
+        assert rows[:, 2].sum() + (leaf_zoom <= zoom).sum() == 4
+    assert leaf_zoom[3] < leaf_zoom[0]
+    assert clusters[12].tolist() == [[1 / 3000, 1 / 3000, 3]]
+
+
+@pytest.mark.parametrize('has_pandas', [True, False])
+def test_factorize(has_pandas):
+    values = ['b', None, 'a', float('nan'), 'b', 1, np.nan]
+    with mock.patch('folium.utilities.pd', pd if has_pandas else None):
+        codes, uniques = factorize(values)
+    assert codes.tolist() == [0, 3, 1, 3, 0, 2, 3]
+    assert uniques.tolist() == ['b', 'a', 1, None]